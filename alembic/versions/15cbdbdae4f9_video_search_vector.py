@@ -0,0 +1,116 @@
+"""Video full-text search vector
+
+Revision ID: 15cbdbdae4f9
+Revises: f82af780bcbe
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15cbdbdae4f9'
+down_revision: Union[str, None] = 'f82af780bcbe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    op.add_column('videos', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index(
+        'ix_videos_search_vector', 'videos', ['search_vector'],
+        postgresql_using='gin'
+    )
+
+    # Rebuild the search vector of the given videos from their title,
+    # presenter names, tag names and description (in decreasing weight)
+    op.execute("""
+        CREATE FUNCTION refresh_video_search_vector(video_ids integer[]) RETURNS void AS $$
+            UPDATE videos SET search_vector =
+                setweight(to_tsvector('simple', unaccent(coalesce(videos.title, ''))), 'A') ||
+                setweight(to_tsvector('simple', unaccent(coalesce((
+                    SELECT string_agg(presenters.name, ' ')
+                    FROM video_presenters
+                    JOIN presenters ON presenters.id = video_presenters.presenter_id
+                    WHERE video_presenters.video_id = videos.id
+                ), ''))), 'A') ||
+                setweight(to_tsvector('simple', unaccent(coalesce((
+                    SELECT string_agg(tag.name, ' ')
+                    FROM video_tags
+                    JOIN tag ON tag.id = video_tags.tag_id
+                    WHERE video_tags.video_id = videos.id
+                ), ''))), 'B') ||
+                setweight(to_tsvector('simple', unaccent(coalesce(videos.description, ''))), 'C')
+            WHERE videos.id = ANY(video_ids);
+        $$ LANGUAGE sql;
+    """)
+
+    # Keep the vector up to date whenever anything it is built from changes
+    op.execute("""
+        CREATE FUNCTION videos_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'videos' THEN
+                PERFORM refresh_video_search_vector(ARRAY[NEW.id]);
+            ELSIF TG_TABLE_NAME IN ('video_presenters', 'video_tags') THEN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM refresh_video_search_vector(ARRAY[OLD.video_id]);
+                ELSE
+                    PERFORM refresh_video_search_vector(ARRAY[NEW.video_id]);
+                END IF;
+            ELSIF TG_TABLE_NAME = 'presenters' THEN
+                PERFORM refresh_video_search_vector(ARRAY(
+                    SELECT video_id FROM video_presenters WHERE presenter_id = NEW.id
+                ));
+            ELSIF TG_TABLE_NAME = 'tag' THEN
+                PERFORM refresh_video_search_vector(ARRAY(
+                    SELECT video_id FROM video_tags WHERE tag_id = NEW.id
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER videos_search_vector_update
+        AFTER INSERT OR UPDATE OF title, description ON videos
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_trigger();
+
+        CREATE TRIGGER video_presenters_search_vector_update
+        AFTER INSERT OR DELETE ON video_presenters
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_trigger();
+
+        CREATE TRIGGER video_tags_search_vector_update
+        AFTER INSERT OR DELETE ON video_tags
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_trigger();
+
+        CREATE TRIGGER presenters_search_vector_update
+        AFTER UPDATE OF name ON presenters
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_trigger();
+
+        CREATE TRIGGER tag_search_vector_update
+        AFTER UPDATE OF name ON tag
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_trigger();
+    """)
+
+    # Backfill existing videos
+    op.execute("SELECT refresh_video_search_vector(ARRAY(SELECT id FROM videos))")
+
+
+def downgrade() -> None:
+    op.execute("""
+        DROP TRIGGER IF EXISTS tag_search_vector_update ON tag;
+        DROP TRIGGER IF EXISTS presenters_search_vector_update ON presenters;
+        DROP TRIGGER IF EXISTS video_tags_search_vector_update ON video_tags;
+        DROP TRIGGER IF EXISTS video_presenters_search_vector_update ON video_presenters;
+        DROP TRIGGER IF EXISTS videos_search_vector_update ON videos;
+        DROP FUNCTION IF EXISTS videos_search_vector_trigger();
+        DROP FUNCTION IF EXISTS refresh_video_search_vector(integer[]);
+    """)
+    op.drop_index('ix_videos_search_vector', table_name='videos')
+    op.drop_column('videos', 'search_vector')
@@ -0,0 +1,54 @@
+"""Stamp updated_at in the database
+
+Revision ID: 20dc4b25ddf7
+Revises: f27f123cb982
+Create Date: 2026-10-18 18:12:47.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20dc4b25ddf7'
+down_revision: Union[str, None] = 'f27f123cb982'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stamp rows with the start of the transaction writing them rather than
+    # the clock of whichever replica flushed them, so the changes feed can
+    # hold back what transactions still running may write (see
+    # ChangeRepository.get_horizon)
+    op.execute("""
+        CREATE FUNCTION stamp_updated_at_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now() AT TIME ZONE 'utc';
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER videos_stamp_updated_at
+        BEFORE INSERT OR UPDATE ON videos
+        FOR EACH ROW EXECUTE FUNCTION stamp_updated_at_trigger();
+
+        CREATE TRIGGER presenters_stamp_updated_at
+        BEFORE INSERT OR UPDATE ON presenters
+        FOR EACH ROW EXECUTE FUNCTION stamp_updated_at_trigger();
+
+        CREATE TRIGGER tag_stamp_updated_at
+        BEFORE INSERT OR UPDATE ON tag
+        FOR EACH ROW EXECUTE FUNCTION stamp_updated_at_trigger();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        DROP TRIGGER IF EXISTS tag_stamp_updated_at ON tag;
+        DROP TRIGGER IF EXISTS presenters_stamp_updated_at ON presenters;
+        DROP TRIGGER IF EXISTS videos_stamp_updated_at ON videos;
+        DROP FUNCTION IF EXISTS stamp_updated_at_trigger();
+    """)
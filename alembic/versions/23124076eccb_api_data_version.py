@@ -0,0 +1,66 @@
+"""API data version
+
+Revision ID: 23124076eccb
+Revises: 2a21dc957cde
+Create Date: 2026-10-18 20:04:51.662387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23124076eccb'
+down_revision: Union[str, None] = '2a21dc957cde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Everything the API responses are built from
+TABLES = (
+    'videos', 'presenters', 'tag', 'tag_category', 'video_presenters',
+    'video_tags'
+)
+
+
+def upgrade() -> None:
+    # A single row counting the transactions that changed the API data,
+    # whichever process, script or manual SQL wrote them. Its ETag.
+    op.create_table(
+        'data_version',
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        # The transaction that last bumped the version
+        sa.Column('xid', sa.Text(), nullable=True)
+    )
+    op.execute("INSERT INTO data_version (version) VALUES (1)")
+
+    # Bumped once per transaction, when it commits: the row lock is taken
+    # last, so writers never hold it while they work, and the new version
+    # only becomes visible together with the data
+    op.execute("""
+        CREATE FUNCTION bump_data_version_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE data_version
+            SET version = version + 1, xid = pg_current_xact_id()::text
+            WHERE xid IS DISTINCT FROM pg_current_xact_id()::text;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in TABLES:
+        op.execute(f"""
+            CREATE CONSTRAINT TRIGGER {table}_bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION bump_data_version_trigger();
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS {table}_bump_data_version ON {table}"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version_trigger()")
+    op.drop_table('data_version')
@@ -0,0 +1,59 @@
+"""Order the changes feed by transaction
+
+Revision ID: 2a21dc957cde
+Revises: 20dc4b25ddf7
+Create Date: 2026-10-18 19:26:03.418206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a21dc957cde'
+down_revision: Union[str, None] = '20dc4b25ddf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('videos', 'presenters', 'tag')
+
+
+def upgrade() -> None:
+    # Rows written so far all come before any new change
+    for table in TABLES:
+        op.add_column(table, sa.Column(
+            'change_seq', sa.BigInteger(), nullable=False,
+            server_default=sa.text('0')
+        ))
+        op.alter_column(table, 'change_seq', server_default=None)
+        op.create_index(f'ix_{table}_change_seq', table, ['change_seq'])
+
+    # Stamp rows with the id of the transaction writing them too: every
+    # transaction with an id below the oldest one still running has ended,
+    # so the changes feed can hold back exactly what may still commit (see
+    # ChangeRepository.get_horizon)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stamp_updated_at_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now() AT TIME ZONE 'utc';
+            NEW.change_seq := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stamp_updated_at_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now() AT TIME ZONE 'utc';
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_change_seq', table_name=table)
+        op.drop_column(table, 'change_seq')
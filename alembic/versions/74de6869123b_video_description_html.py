@@ -0,0 +1,46 @@
+"""Rendered video descriptions
+
+Revision ID: 74de6869123b
+Revises: f300f88c0cdb
+Create Date: 2026-10-18 14:21:06.480117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from markdown import markdown
+
+
+# revision identifiers, used by Alembic.
+revision: str = '74de6869123b'
+down_revision: Union[str, None] = 'f300f88c0cdb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('description_html', sa.Text(), nullable=True))
+
+    # Render the existing descriptions the way the admin does on save
+    videos = sa.table(
+        'videos',
+        sa.column('id', sa.Integer),
+        sa.column('description', sa.String),
+        sa.column('description_html', sa.Text),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(videos.c.id, videos.c.description)
+        .where(videos.c.description.isnot(None), videos.c.description != '')
+    ).all()
+    for video_id, description in rows:
+        connection.execute(
+            videos.update()
+            .where(videos.c.id == video_id)
+            .values(description_html=markdown(description, extensions=['extra']))
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'description_html')
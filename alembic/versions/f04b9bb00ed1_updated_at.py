@@ -0,0 +1,37 @@
+"""Modification times for the API changes feed
+
+Revision ID: f04b9bb00ed1
+Revises: 74de6869123b
+Create Date: 2026-10-18 15:02:37.914265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f04b9bb00ed1'
+down_revision: Union[str, None] = '74de6869123b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('videos', 'presenters', 'tag')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Existing rows count as changed now, the application sets it from then on
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(), nullable=False,
+            server_default=sa.text("(now() AT TIME ZONE 'utc')")
+        ))
+        op.alter_column(table, 'updated_at', server_default=None)
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
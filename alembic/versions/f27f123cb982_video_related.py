@@ -0,0 +1,41 @@
+"""Precomputed related videos
+
+Revision ID: f27f123cb982
+Revises: f04b9bb00ed1
+Create Date: 2026-10-18 16:41:09.205716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27f123cb982'
+down_revision: Union[str, None] = 'f04b9bb00ed1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by scripts/refresh-related-videos.py, the player page falls
+    # back to querying until it first runs
+    op.create_table(
+        'video_related',
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('related_video_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_video_id'], ['videos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('video_id', 'rank')
+    )
+    # Deleting a video deletes the rows suggesting it
+    op.create_index(
+        'ix_video_related_related_video_id', 'video_related', ['related_video_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_related_related_video_id', table_name='video_related')
+    op.drop_table('video_related')
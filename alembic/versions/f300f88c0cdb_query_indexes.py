@@ -0,0 +1,56 @@
+"""Indexes for the schedule, listing and association lookups
+
+Revision ID: f300f88c0cdb
+Revises: 15cbdbdae4f9
+Create Date: 2026-10-18 11:04:27.552918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f300f88c0cdb'
+down_revision: Union[str, None] = '15cbdbdae4f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Live and upcoming sessions
+    op.create_index('ix_videos_unixstart_unixend', 'videos', ['unixstart', 'unixend'])
+    op.create_index('ix_videos_unixend', 'videos', ['unixend'])
+
+    # Recorded videos newest first, matches the /videos listing order
+    op.create_index(
+        'ix_videos_recorded_unixstart', 'videos',
+        [sa.text('unixstart DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('recording IS NOT NULL')
+    )
+
+    # The association primary keys lead with video_id, these cover the
+    # lookups going the other way (videos of a tag or presenter)
+    op.create_index(
+        'ix_video_tags_tag_id_video_id', 'video_tags', ['tag_id', 'video_id']
+    )
+    op.create_index(
+        'ix_video_presenters_presenter_id_video_id', 'video_presenters',
+        ['presenter_id', 'video_id']
+    )
+
+    op.create_index('ix_tag_tag_type_id', 'tag', ['tag_type_id'])
+    op.create_index('ix_tag_category_name', 'tag_category', ['name'])
+    op.create_index('ix_presenters_email', 'presenters', ['email'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_presenters_email', table_name='presenters')
+    op.drop_index('ix_tag_category_name', table_name='tag_category')
+    op.drop_index('ix_tag_tag_type_id', table_name='tag')
+    op.drop_index('ix_video_presenters_presenter_id_video_id', table_name='video_presenters')
+    op.drop_index('ix_video_tags_tag_id_video_id', table_name='video_tags')
+    op.drop_index('ix_videos_recorded_unixstart', table_name='videos')
+    op.drop_index('ix_videos_unixend', table_name='videos')
+    op.drop_index('ix_videos_unixstart_unixend', table_name='videos')
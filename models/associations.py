@@ -1,14 +1,46 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from models.base import Base
 
 class VideoPresenter(Base):
     __tablename__ = "video_presenters"
+    # The primary key covers lookups by video, this one lookups by presenter
+    __table_args__ = (
+        Index(
+            'ix_video_presenters_presenter_id_video_id',
+            'presenter_id',
+            'video_id',
+        ),
+    )
 
     video_id = Column(Integer, ForeignKey('videos.id', ondelete='CASCADE'), primary_key=True)
     presenter_id = Column(Integer, ForeignKey('presenters.id', ondelete='CASCADE'), primary_key=True)
 
 class VideoTag(Base):
     __tablename__ = "video_tags"
+    # The primary key covers lookups by video, this one lookups by tag
+    __table_args__ = (
+        Index('ix_video_tags_tag_id_video_id', 'tag_id', 'video_id'),
+    )
 
     video_id = Column(Integer, ForeignKey('videos.id', ondelete='CASCADE'), primary_key=True)
-    tag_id = Column(Integer, ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True) 
\ No newline at end of file
+    tag_id = Column(
+        Integer, ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True
+    )
+
+
+class VideoRelated(Base):
+    # The videos suggested alongside a video, best first, written by
+    # scripts/refresh-related-videos.py
+    __tablename__ = "video_related"
+    # Deleting a video deletes the rows suggesting it
+    __table_args__ = (
+        Index('ix_video_related_related_video_id', 'related_video_id'),
+    )
+
+    video_id = Column(
+        Integer, ForeignKey('videos.id', ondelete='CASCADE'), primary_key=True
+    )
+    rank = Column(Integer, primary_key=True)
+    related_video_id = Column(
+        Integer, ForeignKey('videos.id', ondelete='CASCADE'), nullable=False
+    )
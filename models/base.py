@@ -1,5 +1,55 @@
-from sqlalchemy.orm import DeclarativeBase
+import time
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import DeclarativeBase, Session
 
 class Base(DeclarativeBase):
   pass
 
+
+def change_sequence():
+    # Orders the API changes feed where the database does not stamp it: the
+    # write time in microseconds
+    return time.time_ns() // 1000
+
+
+@event.listens_for(Session, "before_flush")
+def touch_updated_at(session, flush_context, instances):
+    # `onupdate` only fires when a column of the row changes, not when only
+    # a relationship (e.g. the presenters of a video) does. On PostgreSQL a
+    # trigger overrides these stamps, see ChangeRepository.
+    now = datetime.utcnow()
+    for instance in session.dirty:
+        # Not when only a backref changed, e.g. the videos of a presenter
+        # added to a video: its API representation does not embed them
+        columns_changed = session.is_modified(
+            instance, include_collections=False
+        )
+        if hasattr(instance, "updated_at") and (
+            columns_changed or embedded_rows_changed(instance)
+        ):
+            touch(instance, now)
+        if columns_changed:
+            touch_embedding_rows(instance, now)
+
+
+def embedded_rows_changed(instance):
+    state = inspect(instance)
+    return any(
+        state.attrs[name].history.has_changes()
+        for name in getattr(instance, "__embeds__", ())
+    )
+
+
+def touch(row, now):
+    row.updated_at = now
+    row.change_seq = change_sequence()
+
+
+def touch_embedding_rows(instance, now):
+    # The rows whose API representation embeds this one, e.g. the videos of
+    # a renamed presenter, change with it
+    for name in getattr(instance, "__embedded_in__", ()):
+        for row in getattr(instance, name):
+            touch(row, now)
+            touch_embedding_rows(row, now)
@@ -1,15 +1,33 @@
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime
 from sqlalchemy.orm import relationship
-from models.base import Base
+from models.base import Base, change_sequence
 
 class Presenter(Base):
     __tablename__ = "presenters"
+    __embedded_in__ = ("videos",)
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    email = Column(String, nullable=True)
+    email = Column(String, nullable=True, index=True)
     hrc_id = Column(String, unique=True)
     headshot = Column(String, nullable=True)
+    # Also bumped when its relationships change, for the API changes feed
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+    # Orders the API changes feed, see ChangeRepository
+    change_seq = Column(
+        BigInteger,
+        default=change_sequence,
+        onupdate=change_sequence,
+        nullable=False,
+        index=True,
+    )
 
     # Relationships
     videos = relationship("Video", secondary="video_presenters", back_populates="presenters") 
\ No newline at end of file
@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, DateTime, ForeignKey
+)
 from sqlalchemy.orm import relationship
-from models.base import Base
+from models.base import Base, change_sequence
 
 class TagCategory(Base):
     __tablename__ = "tag_category"
+    __embedded_in__ = ("tags",)
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     
     # Relationships
     tags = relationship("Tag", back_populates="category")
@@ -16,10 +20,29 @@ class TagCategory(Base):
 
 class Tag(Base):
     __tablename__ = "tag"
+    __embedded_in__ = ("videos",)
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    tag_type_id = Column(Integer, ForeignKey('tag_category.id'), nullable=False)
+    tag_type_id = Column(
+        Integer, ForeignKey('tag_category.id'), nullable=False, index=True
+    )
+    # Also bumped when its relationships change, for the API changes feed
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+    # Orders the API changes feed, see ChangeRepository
+    change_seq = Column(
+        BigInteger,
+        default=change_sequence,
+        onupdate=change_sequence,
+        nullable=False,
+        index=True,
+    )
 
     # Relationships
     category = relationship("TagCategory", back_populates="tags")
@@ -1,13 +1,36 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
-from models.base import Base
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Text, DateTime, Index, text
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from models.base import Base, change_sequence
 
 class Video(Base):
     __tablename__ = "videos"
+    __embeds__ = ("presenters", "tags")
+    __table_args__ = (
+        Index(
+            'ix_videos_search_vector', 'search_vector', postgresql_using='gin'
+        ),
+        # Live and upcoming sessions are range scans on the schedule
+        Index('ix_videos_unixstart_unixend', 'unixstart', 'unixend'),
+        Index('ix_videos_unixend', 'unixend'),
+        # Recorded videos newest first, the /videos listing order
+        Index(
+            'ix_videos_recorded_unixstart',
+            text('unixstart DESC'),
+            text('id DESC'),
+            postgresql_where=text('recording IS NOT NULL'),
+            sqlite_where=text('recording IS NOT NULL'),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
+    # The description rendered from markdown when the video is saved
+    description_html = Column(Text, nullable=True)
     unixstart = Column(Integer, nullable=False)
     unixend = Column(Integer, nullable=False)
     stream = Column(String, nullable=True)
@@ -16,6 +39,26 @@ class Video(Base):
     chat_log = Column(String, nullable=True)
     thumbnails = Column(String, nullable=True)
     calendar_event = Column(String, nullable=True)
+    # Maintained by database triggers, see the video search vector migration
+    search_vector = deferred(
+        Column(TSVECTOR().with_variant(Text(), 'sqlite'), nullable=True)
+    )
+    # Also bumped when its relationships change, for the API changes feed
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+    # Orders the API changes feed, see ChangeRepository
+    change_seq = Column(
+        BigInteger,
+        default=change_sequence,
+        onupdate=change_sequence,
+        nullable=False,
+        index=True,
+    )
 
     # Relationships
     presenters = relationship("Presenter", secondary="video_presenters", back_populates="videos")
@@ -0,0 +1,111 @@
+# Time and measure the JSON serializers on a synthetic video export
+#
+# Videos are shaped like VideoModelView.export_json writes them. Peak memory
+# is what tracemalloc sees allocated while encoding, on top of the list.
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp.utils.json_utils import (  # noqa: E402
+    OrjsonSerializer,
+    StdlibSerializer,
+    orjson,
+)
+
+WORDS = (
+    "ubuntu kernel snap charm juju security performance desktop server "
+    "cloud kubernetes maas landscape launchpad canonical roadmap"
+).split()
+
+
+def generate_export(count):
+    videos = []
+    for i in range(count):
+        videos.append(
+            {
+                "title": " ".join(random.choices(WORDS, k=6)).title(),
+                "description": " ".join(random.choices(WORDS, k=80)),
+                "start_time": "2026-01-23 15:30",
+                "end_time": "2026-01-23 16:00",
+                "stream": f"https://stream.example.com/{i}",
+                "slides": f"https://docs.example.com/presentation/{i}/edit",
+                "recording": f"https://drive.example.com/file/{i}/view",
+                "chat_log": "",
+                "thumbnails": f"https://assets.example.com/v1/{i}.png",
+                "calendar_event": "",
+                "presenters": [
+                    f"Presenter {random.randrange(500)}"
+                    for _ in range(random.randint(1, 3))
+                ],
+                "tags": [
+                    {"name": random.choice(WORDS).title(), "category": "Topic"}
+                    for _ in range(random.randint(1, 5))
+                ],
+            }
+        )
+    return videos
+
+
+def measure(encode, value):
+    started = time.perf_counter()
+    output = encode(value)
+    elapsed = time.perf_counter() - started
+    del output
+
+    # Separately, tracing slows down allocations
+    tracemalloc.start()
+    size = len(encode(value))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the JSON serializers on a video export"
+    )
+    parser.add_argument(
+        "--videos",
+        type=int,
+        default=50000,
+        help="number of videos in the export",
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    export = generate_export(args.videos)
+
+    encoders = [
+        (
+            "json indent=2 (before)",
+            lambda value: json.dumps(value, indent=2).encode(),
+        ),
+        ("json compact", StdlibSerializer().dumps),
+    ]
+    if orjson is not None:
+        encoders.append(("orjson compact", OrjsonSerializer().dumps))
+        encoders.append(
+            (
+                "orjson indent=2",
+                lambda value: OrjsonSerializer().dumps(value, indent=True),
+            )
+        )
+    else:
+        print("orjson is not installed, skipping it")
+
+    for name, encode in encoders:
+        elapsed, peak, size = measure(encode, export)
+        print(
+            f"{name:>24}  {elapsed:7.3f} s  peak {peak / 2 ** 20:7.1f} MiB  "
+            f"output {size / 2 ** 20:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Print the query plans of the hot /videos and index page queries
+#
+# Small tables are always sequentially scanned, so the script first inserts
+# a synthetic catalogue (rolled back at the end) to give the planner a
+# realistic choice. Run it once as is and once with --without-indexes to
+# compare with and without the indexes of migration f300f88c0cdb: they are
+# dropped in the same transaction, so the rollback restores them too.
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, select, text, func, and_
+from sqlalchemy.dialects import postgresql
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.video import Video  # noqa: E402
+from models.presenter import Presenter  # noqa: E402
+from models.tag import Tag, TagCategory  # noqa: E402
+from models.associations import VideoPresenter, VideoTag  # noqa: E402
+
+# Created by migration f300f88c0cdb for the queries below
+QUERY_INDEXES = (
+    "ix_videos_unixstart_unixend",
+    "ix_videos_unixend",
+    "ix_videos_recorded_unixstart",
+    "ix_video_tags_tag_id_video_id",
+    "ix_video_presenters_presenter_id_video_id",
+    "ix_tag_tag_type_id",
+    "ix_tag_category_name",
+    "ix_presenters_email",
+)
+
+
+def seed(connection, videos, presenters, tags):
+    """Insert a synthetic catalogue of `videos` talks."""
+    params = {"videos": videos, "presenters": presenters, "tags": tags}
+    statements = [
+        """
+        INSERT INTO tag_category (name)
+        SELECT 'Benchmark category ' || g FROM generate_series(1, 5) g
+        """,
+        """
+        INSERT INTO tag (name, tag_type_id)
+        SELECT 'benchmark-tag-' || g, tag_category.id
+        FROM generate_series(1, :tags) g
+        JOIN tag_category
+          ON tag_category.name = 'Benchmark category ' || (g % 5 + 1)
+        """,
+        """
+        INSERT INTO presenters (name, email, hrc_id)
+        SELECT 'Benchmark presenter ' || g,
+               'benchmark-' || g || '@example.com',
+               'benchmark-' || g
+        FROM generate_series(1, :presenters) g
+        """,
+        # Five years of talks, one in five without a recording yet
+        """
+        INSERT INTO videos (title, unixstart, unixend, recording)
+        SELECT 'Benchmark video ' || g, start, start + 3600,
+               CASE WHEN g % 5 <> 0 THEN 'https://example.com/' || g END
+        FROM (
+            SELECT g, extract(epoch FROM now())::int
+                      - (random() * 5 * 365 * 86400)::int + 30 * 86400 AS start
+            FROM generate_series(1, :videos) g
+        ) talks
+        """,
+        """
+        INSERT INTO video_tags (video_id, tag_id)
+        SELECT DISTINCT videos.id, tag.id
+        FROM videos
+        JOIN tag ON tag.name IN (
+            'benchmark-tag-' || (videos.id % :tags + 1),
+            'benchmark-tag-' || (videos.id * 7 % :tags + 1)
+        )
+        WHERE videos.title LIKE 'Benchmark video %'
+        """,
+        """
+        INSERT INTO video_presenters (video_id, presenter_id)
+        SELECT videos.id, presenters.id
+        FROM videos
+        JOIN presenters
+          ON presenters.hrc_id = 'benchmark-' || (videos.id % :presenters + 1)
+        WHERE videos.title LIKE 'Benchmark video %'
+        """,
+    ]
+    for statement in statements:
+        connection.execute(text(statement), params)
+    connection.execute(text("ANALYZE"))
+
+
+def hot_queries(connection):
+    """The queries behind the index page, /videos and the API, by name."""
+    now = int(time.time())
+    tag_id = connection.execute(select(func.min(Tag.id))).scalar()
+    presenter = connection.execute(
+        select(Presenter.id, Presenter.email)
+        .where(Presenter.email.isnot(None))
+        .limit(1)
+    ).first()
+
+    return {
+        "live videos": select(Video.id).where(
+            and_(Video.unixstart <= now, Video.unixend >= now)
+        ),
+        "upcoming videos (24h)": (
+            select(Video.id)
+            .where(Video.unixstart > now, Video.unixstart <= now + 86400)
+            .order_by(Video.unixstart)
+        ),
+        "recorded videos, first page": (
+            select(Video.id)
+            .where(Video.recording.isnot(None))
+            .order_by(Video.unixstart.desc(), Video.id.desc())
+            .limit(12)
+        ),
+        "videos of a tag": select(VideoTag.video_id).where(
+            VideoTag.tag_id == tag_id
+        ),
+        "videos of a presenter": (
+            select(VideoPresenter.video_id).where(
+                VideoPresenter.presenter_id == presenter.id
+            )
+        ),
+        "tags of a category": (
+            select(Tag.id)
+            .join(TagCategory, Tag.tag_type_id == TagCategory.id)
+            .where(TagCategory.name == "Topic")
+        ),
+        "presenter by email": select(Presenter.id).where(
+            Presenter.email == presenter.email
+        ),
+    }
+
+
+def plan_nodes(plan):
+    """Yield (node type, relation or index) of the nodes of an EXPLAIN plan."""
+    target = plan.get("Index Name") or plan.get("Relation Name") or ""
+    yield plan["Node Type"], target
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(connection, query):
+    sql = str(
+        query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+    result = connection.execute(
+        text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")
+    ).scalar()
+    return result[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print the query plans of the hot queries"
+    )
+    parser.add_argument(
+        "--videos",
+        type=int,
+        default=50000,
+        help="synthetic videos to insert (0 to use the data as is)",
+    )
+    parser.add_argument("--presenters", type=int, default=2000)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument(
+        "--without-indexes",
+        action="store_true",
+        help="drop the query indexes until the rollback, their tables stay "
+        "locked meanwhile",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(os.getenv("DATABASE_URL"))
+    if engine.dialect.name != "postgresql":
+        sys.exit("Query plans are only meaningful against PostgreSQL")
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            if args.without_indexes:
+                for index in QUERY_INDEXES:
+                    connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            if args.videos:
+                seed(connection, args.videos, args.presenters, args.tags)
+
+            for name, query in hot_queries(connection).items():
+                explained = explain(connection, query)
+                scans = ", ".join(
+                    f"{node} on {target}" if target else node
+                    for node, target in plan_nodes(explained["Plan"])
+                    if "Scan" in node
+                )
+                elapsed = explained["Execution Time"]
+                print(f"{name:<30} {elapsed:>9.3f} ms  {scans}")
+        finally:
+            # Never keep the synthetic data
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Time the full recomputation of the related videos on synthetic catalogues
+#
+# Videos get tags and presenters the way import-dynamic-placeholder-data.py
+# assigns them (1-5 of its 16 tags and 1-5 of its 6 presenters), which is a
+# worst case: almost every pair of videos shares something.
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp.services.related_videos import (  # noqa: E402
+    compute_related,
+    CATEGORY_WEIGHTS,
+)
+
+TAG_CATEGORIES = ["Topic"] * 6 + ["Event"] * 6 + ["Date"] * 4
+PRESENTERS = 6
+
+
+def generate_catalogue(count, now_unix):
+    starts = {}
+    video_tags = {}
+    video_presenters = {}
+    for video_id in range(1, count + 1):
+        starts[video_id] = now_unix - random.randint(1, 5 * 365) * 86400
+        tags = random.sample(range(len(TAG_CATEGORIES)), random.randint(1, 5))
+        video_tags[video_id] = {
+            tag_id: CATEGORY_WEIGHTS[TAG_CATEGORIES[tag_id]] for tag_id in tags
+        }
+        video_presenters[video_id] = set(
+            random.sample(range(PRESENTERS), random.randint(1, 5))
+        )
+    return starts, video_tags, video_presenters
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the related videos computation"
+    )
+    parser.add_argument(
+        "sizes",
+        nargs="*",
+        type=int,
+        default=[10000, 100000],
+        help="catalogue sizes to benchmark",
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    now_unix = int(time.time())
+    for count in args.sizes:
+        catalogue = generate_catalogue(count, now_unix)
+        started = time.perf_counter()
+        related = compute_related(*catalogue, now_unix=now_unix)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{count:>7} videos  {elapsed:8.2f} s  "
+            f"{elapsed / count * 1e6:8.1f} us/video  "
+            f"{sum(map(len, related.values())) / count:.1f} related/video"
+        )
+
+
+if __name__ == "__main__":
+    main()
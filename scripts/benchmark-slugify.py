@@ -0,0 +1,62 @@
+# Time the slugify template filter over the titles in videos.json
+#
+# Pages slugify the same titles over and over, so this replays them the way
+# a listing does: every title once per page, for a number of pages.
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from slugify import slugify as py_slugify  # noqa: E402
+
+from webapp.utils.text_utils import slugify, slug_cache  # noqa: E402
+
+
+def time_pages(function, titles, pages):
+    started = time.perf_counter()
+    for _ in range(pages):
+        for title in titles:
+            function(title)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the memoised slugify against python-slugify"
+    )
+    parser.add_argument(
+        "--file",
+        default="videos.json",
+        help="JSON list of videos with a title",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=1000,
+        help="number of times every title is slugified",
+    )
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        titles = [video["title"] for video in json.load(f)]
+    calls = len(titles) * args.pages
+
+    for name, function in (
+        ("python-slugify", py_slugify),
+        ("memoised", slugify),
+    ):
+        elapsed = time_pages(function, titles, args.pages)
+        per_call = elapsed / calls * 1e6
+        print(f"{name:>15}  {elapsed:8.3f} s  {per_call:8.2f} us/call")
+
+    print(
+        f"{len(titles)} titles, {slug_cache.hits} hits, "
+        f"{slug_cache.misses} misses, hit rate {slug_cache.hit_rate:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
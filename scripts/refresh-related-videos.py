@@ -0,0 +1,66 @@
+# Recompute the related videos suggested on the player page and store them
+# in the video_related table, which the web workers read
+#
+# Run it once, e.g. from cron, or with --every to keep it running. In the
+# rock it is the related-videos-scheduler service, which the charm only
+# starts on one unit. Never run it in the web workers: the computation is
+# CPU bound and would block their event loop.
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Bridge the paas-charm injected database URL, like app.py does
+if not os.environ.get("DATABASE_URL") and os.environ.get(
+    "POSTGRESQL_DB_CONNECT_STRING"
+):
+    os.environ["DATABASE_URL"] = os.environ["POSTGRESQL_DB_CONNECT_STRING"]
+
+# Mapped by Video.presenters
+import models.presenter  # noqa: F401, E402
+from webapp.database import db_session  # noqa: E402
+from webapp.services.related_videos import RelatedVideosJob  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompute the related videos of every recorded video"
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        metavar="SECONDS",
+        help="keep running, checking for changes every SECONDS",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=3600,
+        metavar="SECONDS",
+        help="with --every, recompute at least this often for "
+        "the recency bonus (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    job = RelatedVideosJob(db_session.session_factory, max_age=args.max_age)
+    if args.every is None:
+        job.run(force=True)
+        return
+
+    while True:
+        try:
+            job.run()
+        except Exception:
+            logger.exception("Failed to compute related videos")
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import os
 import requests
 import logging
 from webapp.database import db_session
+from webapp.invalidation import invalidation_bus
 from models.presenter import Presenter
 
 # Set up logging
@@ -97,6 +98,7 @@ def update_presenters():
         
         if updated_count > 0 or new_count > 0:
             db_session.commit()
+            invalidation_bus.publish('presenters')
             logger.info(f"Successfully updated {updated_count} and created {new_count} presenters")
         return True
         
@@ -104,6 +106,10 @@ def update_presenters():
         db_session.rollback()
         logger.error(f"Error updating presenters: {e}")
         raise
+    finally:
+        # The scheduler thread keeps its session between runs: never leave
+        # the transaction of the lookups open until the next one
+        db_session.remove()
 
 if __name__ == "__main__":
     update_presenters() 
\ No newline at end of file
@@ -1,8 +1,12 @@
+import os
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from webapp.app import app
+from webapp.database import db_session, engine as app_engine
 from models.base import Base
+from webapp.invalidation import invalidation_bus, CATALOGUE_TOPICS
 
 
 @pytest.fixture
@@ -30,3 +34,85 @@ def test_db():
 
     Base.metadata.drop_all(engine)
     test_db.close()
+
+
+@pytest.fixture
+def app_db():
+    # Bind the application's scoped session to a single in-memory SQLite
+    # connection so repositories and views see the test data
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+
+    db_session.remove()
+    db_session.configure(bind=engine)
+    # Caches built from another test's data
+    invalidation_bus.publish(*CATALOGUE_TOPICS)
+
+    yield db_session
+
+    db_session.remove()
+    db_session.configure(bind=app_engine)
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def postgres_url():
+    # The search vector and the triggers only exist in a PostgreSQL database
+    # migrated with alembic
+    url = os.environ.get('TEST_POSTGRES_URL')
+    if not url:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    return url
+
+
+@pytest.fixture
+def postgres_db(postgres_url):
+    # Every test runs in a transaction rolled back at the end
+    engine = create_engine(postgres_url)
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    db_session.remove()
+    db_session.configure(
+        bind=connection, join_transaction_mode='create_savepoint'
+    )
+
+    yield db_session
+
+    db_session.remove()
+    db_session.configure(
+        bind=app_engine, join_transaction_mode='conditional_savepoint'
+    )
+    transaction.rollback()
+    connection.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_engine(postgres_url):
+    # For tests needing transactions of their own, which commit for real:
+    # they must delete what they write
+    engine = create_engine(postgres_url)
+
+    db_session.remove()
+    db_session.configure(bind=engine)
+
+    yield engine
+
+    db_session.remove()
+    db_session.configure(bind=app_engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def query_counter(app_db):
+    # Count the SQL statements issued through the application's session
+    statements = []
+    bind = app_db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(bind, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(bind, 'before_cursor_execute', before_cursor_execute)
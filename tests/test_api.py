@@ -1,5 +1,15 @@
 import json
+import pytest
+from sqlalchemy import delete, insert, select
 from models.presenter import Presenter
+from models.tag import Tag, TagCategory
+from models.video import Video
+from webapp.invalidation import invalidation_bus
+from webapp.repositories.presenter_repository import PresenterRepository
+from webapp.utils.cursors import encode_cursor
+from webapp.utils.json_utils import (
+    OrjsonSerializer, StdlibSerializer, dumps, stream_json
+)
 
 
 def test_get_presenters(client, test_db):
@@ -23,4 +33,405 @@ def test_get_presenters(client, test_db):
 
 def test_get_presenter_not_found(client):
     response = client.get('/api/v1/presenters/999')
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+
+def add_presenters(session, count):
+    for i in range(count):
+        session.add(
+            Presenter(
+                name=f"Presenter {i}",
+                email=f"p{i}@canonical.com",
+                hrc_id=f"hrc-{i}",
+            )
+        )
+    session.commit()
+
+
+def test_presenters_are_paged_with_sparse_fields(client, app_db, monkeypatch):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+    add_presenters(app_db, 5)
+
+    names = []
+    url = '/api/v1/presenters?limit=2&fields=name'
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        names.extend(presenter['name'] for presenter in response.get_json())
+        link = response.headers.get('Link')
+        url = link[1:link.index('>')] if link else None
+
+    assert names == [f"Presenter {i}" for i in range(5)]
+
+
+def test_presenters_are_streamed_without_limit(client, app_db, monkeypatch):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    add_presenters(app_db, 3)
+
+    response = client.get(
+        '/api/v1/presenters?fields=id,hrc_id',
+        headers={'Authorization': 'Bearer secret'},
+    )
+
+    assert response.is_streamed
+    assert json.loads(response.data) == [
+        {'id': i + 1, 'hrc_id': f"hrc-{i}"} for i in range(3)
+    ]
+    assert (
+        client.get(
+            '/api/v1/presenters?fields=id,salary',
+            headers={'Authorization': 'Bearer secret'},
+        ).status_code
+        == 400
+    )
+
+
+def test_batch_talks_use_a_fixed_number_of_queries(
+    client, app_db, query_counter, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    add_presenters(app_db, 6)
+    presenters = app_db.query(Presenter).order_by(Presenter.id).all()
+    topic = TagCategory(name="Topic")
+    for i in range(12):
+        video = Video(
+            title=f"Talk {i}", unixstart=1700000000 + i, unixend=1700000100 + i
+        )
+        video.presenters = [presenters[i % 6], presenters[(i + 1) % 6]]
+        video.tags = [Tag(name=f"Tag {i}", category=topic)]
+        app_db.add(video)
+    app_db.commit()
+    app_db.expunge_all()
+    query_counter.clear()
+
+    response = client.post(
+        '/api/v1/presenters/talks?fields=id,presenters,tags',
+        json={
+            'hrc_ids': ['hrc-0', 'hrc-1', 'hrc-9'],
+            'emails': [
+                'p2@canonical.com',
+                'p3@canonical.com',
+                'p4@canonical.com',
+            ],
+        },
+        headers={'Authorization': 'Bearer secret'},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['hrc_ids']['hrc-9'] is None
+    assert [talk['id'] for talk in data['hrc_ids']['hrc-0']['talks']] == [
+        12,
+        7,
+        6,
+        1,
+    ]
+    assert sorted(
+        data['hrc_ids']['hrc-0']['talks'][0]['presenters'],
+        key=lambda p: p['name'],
+    ) == [
+        {'name': 'Presenter 0', 'hrc_id': 'hrc-0'},
+        {'name': 'Presenter 5', 'hrc_id': 'hrc-5'},
+    ]
+    assert data['emails']['p3@canonical.com']['talks'][0]['tags'] == [
+        {'name': 'Tag 9', 'category': 'Topic'}
+    ]
+    # Presenters, their videos, the videos' presenters and tags
+    assert len(query_counter) == 4
+
+
+def test_unchanged_data_is_not_sent_again(
+    client, app_db, query_counter, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+    add_presenters(app_db, 2)
+
+    first = client.get('/api/v1/presenters?limit=1', headers=headers)
+    assert len(first.get_json()) == 1
+    etag = first.headers['ETag']
+    query_counter.clear()
+
+    with monkeypatch.context() as patch:
+        # Answered from the data version alone, the view does not run
+        patch.setattr(
+            PresenterRepository,
+            'iter_presenter_rows',
+            lambda *args: pytest.fail("the view ran"),
+        )
+        cached = client.get(
+            '/api/v1/presenters?limit=1',
+            headers={**headers, 'If-None-Match': etag},
+        )
+    assert (cached.status_code, cached.data, cached.headers['ETag']) == (
+        304,
+        b'',
+        etag,
+    )
+    assert len(query_counter) == 1
+
+    # Not a version of this process: the bus does not change it...
+    invalidation_bus.publish('presenters')
+    assert client.get(
+        '/api/v1/presenters?limit=1',
+        headers={**headers, 'If-None-Match': etag},
+    ).status_code == 304
+
+    # ...but a write made without it does
+    app_db.get(Presenter, 1).name = "Renamed"
+    app_db.commit()
+    changed = client.get(
+        '/api/v1/presenters?limit=1',
+        headers={**headers, 'If-None-Match': etag},
+    )
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_deleted_resource_is_not_reported_unchanged(
+    client, app_db, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+    add_presenters(app_db, 1)
+
+    first = client.get('/api/v1/presenters/1', headers=headers)
+    assert first.status_code == 200
+    # Last-Modified has a one second resolution, only the ETag is used
+    assert 'Last-Modified' not in first.headers
+    assert (
+        client.get(
+            '/api/v1/presenters/1',
+            headers={
+                **headers,
+                'If-Modified-Since': 'Mon, 01 Jan 2125 00:00:00 GMT',
+            },
+        ).status_code
+        == 200
+    )
+
+    # Deleted without going through the invalidation bus
+    app_db.delete(app_db.get(Presenter, 1))
+    app_db.commit()
+
+    deleted = client.get(
+        '/api/v1/presenters/1',
+        headers={**headers, 'If-None-Match': first.headers['ETag']},
+    )
+    assert deleted.status_code == 404
+
+
+def test_changes_feed_returns_only_rows_changed_since_the_cursor(
+    client, app_db, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+    add_presenters(app_db, 3)
+    topic = TagCategory(name="Topic")
+    for i in range(3):
+        video = Video(
+            title=f"Talk {i}", unixstart=1700000000 + i, unixend=1700000100 + i
+        )
+        video.tags = [Tag(name=f"Tag {i}", category=topic)]
+        app_db.add(video)
+    app_db.commit()
+
+    pages = []
+    cursor = ''
+    while not pages or pages[-1]['has_more']:
+        pages.append(
+            client.get(
+                f'/api/v1/changes?limit=2&since={cursor}', headers=headers
+            ).get_json()
+        )
+        cursor = pages[-1]['next_cursor']
+    assert [[row['id'] for row in page['presenters']] for page in pages] == [
+        [1, 2],
+        [3],
+    ]
+    assert sum(len(page['videos']) for page in pages) == 3
+
+    # A relationship change counts as a change of the video, not of the
+    # presenter, even with its videos loaded (as in the admin)
+    presenter = app_db.get(Presenter, 1)
+    assert presenter.videos == []
+    video = app_db.get(Video, 2)
+    video.presenters.append(presenter)
+    app_db.commit()
+
+    changes = client.get(
+        f'/api/v1/changes?since={cursor}', headers=headers
+    ).get_json()
+    assert [row['id'] for row in changes['videos']] == [2]
+    assert changes['videos'][0]['presenters'] == [
+        {'name': 'Presenter 0', 'hrc_id': 'hrc-0'}
+    ]
+    assert changes['presenters'] == changes['tags'] == []
+    assert (
+        client.get('/api/v1/changes?since=bogus', headers=headers).status_code
+        == 400
+    )
+    for position in (10**30, 0), (0, 2**63):
+        out_of_range = encode_cursor(*position * 3)
+        response = client.get(
+            f'/api/v1/changes?since={out_of_range}', headers=headers
+        )
+        assert response.status_code == 400
+
+
+def test_changes_feed_reports_the_rows_embedding_a_renamed_row(
+    client, app_db, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+    add_presenters(app_db, 2)
+    topic = TagCategory(name="Topic")
+    for i in range(2):
+        video = Video(
+            title=f"Talk {i}", unixstart=1700000000 + i, unixend=1700000100 + i
+        )
+        video.presenters = [app_db.get(Presenter, i + 1)]
+        video.tags = [Tag(name=f"Tag {i}", category=topic)]
+        app_db.add(video)
+    app_db.commit()
+    cursor = client.get('/api/v1/changes', headers=headers).get_json()[
+        'next_cursor'
+    ]
+
+    app_db.get(Presenter, 1).name = "Renamed"
+    app_db.commit()
+    changes = client.get(
+        f'/api/v1/changes?since={cursor}', headers=headers
+    ).get_json()
+    assert [row['id'] for row in changes['presenters']] == [1]
+    assert [row['presenters'] for row in changes['videos']] == [
+        [{'name': 'Renamed', 'hrc_id': 'hrc-0'}]
+    ]
+    assert changes['tags'] == []
+
+    app_db.get(TagCategory, 1).name = "Subject"
+    app_db.commit()
+    changes = client.get(
+        f"/api/v1/changes?since={changes['next_cursor']}", headers=headers
+    ).get_json()
+    assert [row['category'] for row in changes['tags']] == [
+        "Subject",
+        "Subject",
+    ]
+    assert sorted(row['id'] for row in changes['videos']) == [1, 2]
+    assert changes['presenters'] == []
+
+
+@pytest.mark.postgres
+def test_changes_committed_after_later_ones_are_not_skipped(
+    client, postgres_engine, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+
+    def read_changes(cursor):
+        names = []
+        while True:
+            page = client.get(
+                f'/api/v1/changes?since={cursor}', headers=headers
+            ).get_json()
+            names += [
+                row['name']
+                for row in page['presenters']
+                if row['hrc_id'].startswith('race-')
+            ]
+            if not page['has_more']:
+                return names, page['next_cursor']
+            cursor = page['next_cursor']
+
+    _, cursor = read_changes('')
+    slow = postgres_engine.connect()
+    idle = postgres_engine.connect()
+    try:
+        # A transaction left open after reading holds nothing back
+        idle.begin()
+        idle.execute(select(Presenter.id).limit(1))
+
+        # Gets the older transaction id, but commits after the fast one
+        slow_transaction = slow.begin()
+        slow.execute(insert(Presenter).values(name="Slow", hrc_id='race-slow'))
+        with postgres_engine.begin() as fast:
+            fast.execute(
+                insert(Presenter).values(name="Fast", hrc_id='race-fast')
+            )
+
+        names, cursor = read_changes(cursor)
+        assert names == []
+
+        slow_transaction.commit()
+        names, cursor = read_changes(cursor)
+        assert names == ["Slow", "Fast"]
+    finally:
+        slow.close()
+        idle.close()
+        with postgres_engine.begin() as connection:
+            connection.execute(
+                delete(Presenter).where(Presenter.hrc_id.like('race-%'))
+            )
+
+
+@pytest.mark.postgres
+def test_etag_changes_with_writes_made_outside_the_app(
+    client, postgres_engine, monkeypatch
+):
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    headers = {'Authorization': 'Bearer secret'}
+
+    def etag():
+        return client.get('/api/v1/presenters', headers=headers).headers[
+            'ETag'
+        ]
+
+    first = etag()
+    assert etag() == first
+    try:
+        # As an import script or a manual SQL session would
+        with postgres_engine.begin() as connection:
+            connection.execute(
+                insert(Presenter).values(name="Script", hrc_id='etag-1')
+            )
+        inserted = etag()
+        assert inserted != first
+    finally:
+        with postgres_engine.begin() as connection:
+            connection.execute(
+                delete(Presenter).where(Presenter.hrc_id == 'etag-1')
+            )
+    assert etag() not in (first, inserted)
+
+
+def test_serializers_agree():
+    value = {
+        'talks': [
+            {'id': 1, 'title': 'Día 1', 'tags': [], 'recording_url': None}
+        ]
+    }
+
+    compact = StdlibSerializer().dumps(value)
+    assert compact == (
+        '{"talks":[{"id":1,"title":"Día 1","tags":[],'
+        '"recording_url":null}]}'.encode()
+    )
+    assert OrjsonSerializer().dumps(value) == compact
+    assert OrjsonSerializer().dumps(
+        value, indent=True
+    ) == StdlibSerializer().dumps(value, indent=True)
+
+
+def test_stream_json_matches_dumps(test_app):
+    items = [
+        {'name': 'Q1 2024', 'category': 'Date'},
+        {'name': 'Python', 'category': 'Topic'},
+    ]
+
+    with test_app.test_request_context():
+        for value in (items, []):
+            for indent in (False, True):
+                response = stream_json(iter(value), indent=indent)
+                assert response.get_data() == dumps(value, indent)
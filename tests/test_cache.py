@@ -0,0 +1,56 @@
+from unittest import mock
+from webapp.utils.cache import LRUCache
+from webapp.utils.text_utils import (
+    markdown_cache,
+    render_markdown,
+    slugify,
+    slug_cache,
+)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache(ttl=10)
+    with mock.patch("webapp.utils.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with mock.patch("webapp.utils.cache.time.monotonic", return_value=109):
+        assert cache.get("a") == 1
+    with mock.patch("webapp.utils.cache.time.monotonic", return_value=110):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_slugify_is_memoised():
+    hits, misses = slug_cache.hits, slug_cache.misses
+    assert slugify("Memoised Summit: Día 1") == "memoised-summit-dia-1"
+    assert slugify("Memoised Summit: Día 1") == "memoised-summit-dia-1"
+    assert (slug_cache.hits - hits, slug_cache.misses - misses) == (1, 1)
+
+
+def test_markdown_is_rendered_once_per_content():
+    hits, misses = markdown_cache.hits, markdown_cache.misses
+    assert (
+        render_markdown("Some **cached** text")
+        == "<p>Some <strong>cached</strong> text</p>"
+    )
+    assert (
+        render_markdown("Some **cached** text")
+        == "<p>Some <strong>cached</strong> text</p>"
+    )
+    assert render_markdown(None) == ""
+    assert (markdown_cache.hits - hits, markdown_cache.misses - misses) == (
+        1,
+        1,
+    )
@@ -0,0 +1,77 @@
+import os
+import shutil
+import pytest
+from datetime import datetime
+from webapp.services.event_registry import EventRegistry, InvalidEventError
+
+EVENT = """
+title: Product Roadmap Sprint
+subtitle: Madrid, May 2026
+all_videos_url: /videos?event=roadmap-sprint&date=q2-2026
+days:
+  - date: 2026-05-04
+    title: Monday, May 4
+    sessions:
+      - title: Plenary
+        start: 2026-05-04 08:30:00
+        end: "2026-05-04T09:30:00Z"
+"""
+
+
+@pytest.fixture
+def events_dir(tmp_path):
+    shutil.copy(os.path.join("events", "event.schema.json"), tmp_path)
+    return tmp_path
+
+
+def write_event(directory, slug, content, mtime):
+    path = directory / f"{slug}.yaml"
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_events_are_parsed_validated_and_cached(events_dir):
+    write_event(events_dir, "sprint", EVENT, 1000)
+    registry = EventRegistry(str(events_dir), check_interval=0)
+
+    event = registry.get("sprint")
+    session = event["days"][0]["sessions"][0]
+    assert session["start"] == datetime(2026, 5, 4, 8, 30)
+    assert session["end"] == datetime.fromisoformat(
+        "2026-05-04T09:30:00+00:00"
+    )
+
+    assert registry.get("sprint") is event
+    assert registry.get("missing") is None
+    assert registry.get("../sprint") is None
+
+
+def test_events_are_reloaded_when_the_file_changes(events_dir):
+    write_event(events_dir, "sprint", EVENT, 1000)
+    registry = EventRegistry(str(events_dir), check_interval=0)
+    assert registry.get("sprint")["title"] == "Product Roadmap Sprint"
+
+    write_event(
+        events_dir, "sprint", EVENT.replace("Product", "Engineering"), 2000
+    )
+    assert registry.get("sprint")["title"] == "Engineering Roadmap Sprint"
+
+
+def test_invalid_events_are_rejected(events_dir):
+    write_event(
+        events_dir,
+        "sprint",
+        EVENT.replace("08:30:00", "half past eight"),
+        1000,
+    )
+    registry = EventRegistry(str(events_dir))
+
+    with pytest.raises(InvalidEventError, match="days/0/sessions/0/start"):
+        registry.get("sprint")
+
+
+def test_bundled_events_are_valid():
+    registry = EventRegistry()
+    for filename in os.listdir("events"):
+        if filename.endswith(".yaml"):
+            assert registry.get(filename[: -len(".yaml")]) is not None
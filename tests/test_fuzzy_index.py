@@ -0,0 +1,86 @@
+import pytest
+from models.video import Video
+from models.presenter import Presenter
+from webapp.services.fuzzy_index import FuzzyIndex, SIMILARITY_THRESHOLD
+from webapp.services.video_service import VideoService
+from webapp.utils.text_utils import TrigramIndex, trigrams
+
+DOCUMENTS = [
+    (1, "Python packaging"),
+    (2, "Deploying Kubernetes"),
+    (3, "Python on Kubernetes"),
+    (4, "Pylon design"),
+]
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a") == {"  a", " a "}
+
+
+@pytest.mark.parametrize(
+    "word, other, similarity",
+    [
+        ("python", "python", 1.0),
+        ("pythn", "python", 4 / 9),
+        ("melisa", "melissa", 6 / 9),
+        ("python", "pylon", 3 / 10),
+    ],
+)
+def test_similarity_is_shared_over_all_trigrams(word, other, similarity):
+    matches = dict(TrigramIndex([other]).search(word, threshold=0))
+
+    assert matches[other] == pytest.approx(similarity)
+
+
+def test_typos_find_the_intended_word():
+    index = FuzzyIndex(DOCUMENTS)
+
+    assert index.match("pythn") == {1, 3}
+    assert index.match("kubernets") == {2, 3}
+
+
+def test_threshold_leaves_out_unrelated_words():
+    index = FuzzyIndex(DOCUMENTS)
+
+    # "pylon" shares the start of "python" but is below the threshold
+    assert 4 not in index.match("python")
+    assert index.match("python", threshold=0.3) == {1, 3, 4}
+    assert index.match("golang") == set()
+    assert SIMILARITY_THRESHOLD > 0.3
+
+
+def test_every_word_of_the_query_must_match():
+    index = FuzzyIndex(DOCUMENTS)
+
+    assert index.match("pythn kubernetes") == {3}
+    assert index.match("pythn golang") == set()
+
+
+@pytest.mark.parametrize("query", ["", "   ", "!?", "py", "k"])
+def test_empty_and_short_queries_match_nothing(query):
+    assert FuzzyIndex(DOCUMENTS).match(query) == set()
+
+
+def test_search_falls_back_to_typo_tolerant_matching(app_db):
+    for i, title in enumerate(["Python packaging", "Kubernetes operators"]):
+        video = Video(
+            title=title,
+            unixstart=1700000000 + i * 3600,
+            unixend=1700000000 + i * 3600 + 1800,
+            recording=f"https://example.com/{i}",
+        )
+        video.presenters = [
+            Presenter(name=f"Presenter {i}", hrc_id=f"hrc-{i}")
+        ]
+        app_db.add(video)
+    app_db.commit()
+
+    videos, total, _ = VideoService().search_videos(
+        "pythn", [], [], [], [], 1, 12
+    )
+
+    assert ([video.title for video in videos], total) == (
+        ["Python packaging"],
+        1,
+    )
@@ -0,0 +1,47 @@
+import json
+from sqlalchemy import create_engine
+from webapp.invalidation import InvalidationBus
+
+
+def make_bus():
+    return InvalidationBus(create_engine("sqlite://"))
+
+
+def test_publish_dispatches_to_matching_subscribers():
+    bus = make_bus()
+    videos, everything = [], []
+    bus.subscribe(videos.append, ["videos"])
+    bus.subscribe(everything.append)
+
+    bus.publish("videos")
+    bus.publish("video_submissions")
+
+    assert [event.version for event in videos] == [1]
+    assert [event.version for event in everything] == [1, 2]
+    assert bus.version == 2
+
+
+def test_events_from_other_processes_bump_the_version():
+    bus = make_bus()
+    events = []
+    bus.subscribe(events.append)
+
+    bus._receive(json.dumps({"origin": "other", "topics": ["presenters"]}))
+    # Its own notifications come back too and were already dispatched
+    bus._receive(json.dumps({"origin": bus.origin, "topics": ["presenters"]}))
+
+    assert [(event.version, event.origin) for event in events] == [
+        (1, "other")
+    ]
+    assert events[0].topics == {"presenters"}
+
+
+def test_failing_subscriber_does_not_stop_the_others():
+    bus = make_bus()
+    events = []
+    bus.subscribe(lambda event: 1 / 0)
+    bus.subscribe(events.append)
+
+    bus.publish("tag")
+
+    assert len(events) == 1
@@ -0,0 +1,83 @@
+from unidecode import unidecode
+from webapp.services.presenter_index import PresenterNameIndex
+
+PRESENTERS = [
+    (1, "Finn Rawles"),
+    (2, "Melissa Carlson"),
+    (3, "José Núñez"),
+    (4, "Anne-Marie van der Berg"),
+    (5, "Zoë Ó Briain"),
+    (6, "Li Wei"),
+    (7, "Mark"),
+]
+
+
+def linear_scan(presenters, query):
+    # The rules of the search fallback before the index, one presenter at a
+    # time
+    query = unidecode(query.lower())
+    matches = set()
+    for presenter_id, name in presenters:
+        name = unidecode(name.lower())
+        if query in name:
+            matches.add(presenter_id)
+            continue
+        for part in name.split():
+            if (
+                part.startswith(query)
+                or query.startswith(part)
+                or query in part
+            ):
+                matches.add(presenter_id)
+                break
+    return matches
+
+
+def test_matches_the_linear_scan():
+    index = PresenterNameIndex(PRESENTERS)
+    queries = [
+        "finn",
+        "fin",
+        "f",
+        "rawles",
+        "awl",
+        "finn rawles",
+        "finnegan",
+        "melisa",
+        "carl",
+        "son",
+        "jose",
+        "josé",
+        "nunez",
+        "núñez",
+        "jose nu",
+        "anne-marie",
+        "anne",
+        "marie",
+        "van der",
+        "berg",
+        "der b",
+        "zoe",
+        "zoë ó",
+        "o briain",
+        "briain",
+        "li",
+        "liwei",
+        "wei",
+        "mark",
+        "markus",
+        "marketing",
+        "x",
+        "zzz",
+    ]
+
+    for query in queries:
+        assert index.match(query) == linear_scan(PRESENTERS, query), query
+
+
+def test_query_starting_with_a_name_part_matches():
+    index = PresenterNameIndex(PRESENTERS)
+
+    # "mark" is a whole name part the query starts with
+    assert index.match("marketing") == {7}
+    assert index.match("finnegan") == {1}
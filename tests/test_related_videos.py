@@ -0,0 +1,89 @@
+from models.associations import VideoRelated
+from models.presenter import Presenter
+from models.tag import Tag, TagCategory
+from models.video import Video
+from webapp.services.related_videos import (
+    RelatedVideosJob,
+    compute_related,
+    CATEGORY_WEIGHTS,
+)
+from webapp.services.video_service import VideoService
+
+NOW = 1700000000
+YEAR = 365 * 86400
+TOPIC = CATEGORY_WEIGHTS["Topic"]
+EVENT = CATEGORY_WEIGHTS["Event"]
+DATE = CATEGORY_WEIGHTS["Date"]
+
+
+def test_related_videos_are_ranked_by_weighted_overlap():
+    starts = {1: NOW, 2: NOW, 3: NOW, 4: NOW, 5: NOW}
+    video_tags = {
+        1: {"kubernetes": TOPIC, "sprint": EVENT, "q1": DATE},
+        2: {"kubernetes": TOPIC, "sprint": EVENT},
+        3: {"q1": DATE},
+        4: {"sprint": EVENT},
+    }
+    video_presenters = {1: {"alice"}, 4: {"alice"}}
+
+    related = compute_related(starts, video_tags, video_presenters, NOW)
+
+    # Topic + event (4) > event + presenter (3) > date (0.5), against the
+    # order of the ids that breaks ties; 5 shares nothing
+    assert related[1] == [2, 4, 3]
+    assert related[5] == []
+
+
+def test_recency_breaks_ties():
+    starts = {1: NOW, 2: NOW - 3 * YEAR, 3: NOW - YEAR}
+    video_tags = {video_id: {"kubernetes": TOPIC} for video_id in starts}
+
+    related = compute_related(starts, video_tags, {}, NOW, top_n=1)
+
+    assert related == {1: [3], 2: [1], 3: [1]}
+
+
+def test_job_stores_the_related_videos_the_player_page_reads(
+    app_db, query_counter
+):
+    topic = TagCategory(name="Topic")
+    kubernetes = Tag(name="Kubernetes", category=topic)
+    juju = Tag(name="Juju", category=topic)
+    for i, tags in enumerate(
+        [[kubernetes, juju], [kubernetes], [juju], [kubernetes, juju]]
+    ):
+        video = Video(
+            title=f"Talk {i}",
+            unixstart=NOW + i,
+            unixend=NOW + i + 1800,
+            recording=f"https://example.com/{i}",
+        )
+        video.tags = tags
+        video.presenters = [
+            Presenter(name=f"Presenter {i}", hrc_id=f"hrc-{i}")
+        ]
+        app_db.add(video)
+    app_db.commit()
+    job = RelatedVideosJob(lambda: app_db)
+
+    assert job.run()
+    # Nothing changed since
+    assert not job.run()
+    assert app_db.query(VideoRelated).filter_by(video_id=1).count() == 3
+
+    video = app_db.get(Video, 1)
+    query_counter.clear()
+    suggested = VideoService().get_suggested_videos(video, limit=2)
+
+    assert [related.id for related in suggested] == [4, 3]
+    # The related videos with their presenters and tags
+    assert len(query_counter) == 3
+
+    app_db.get(Video, 4).recording = None
+    app_db.commit()
+    assert job.run()
+    video = app_db.get(Video, 1)
+    assert [
+        related.id
+        for related in VideoService().get_suggested_videos(video, limit=2)
+    ] == [3, 2]
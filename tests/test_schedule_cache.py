@@ -0,0 +1,59 @@
+from models.video import Video
+from models.presenter import Presenter
+from webapp.services.schedule_cache import ScheduleCache
+
+NOW = 1700000000
+
+
+def add_session(session, title, start, end):
+    video = Video(title=title, unixstart=start, unixend=end)
+    video.presenters = [
+        Presenter(name=f"{title} presenter", hrc_id=f"hrc-{title}")
+    ]
+    session.add(video)
+    session.commit()
+
+
+def titles(videos):
+    return [video.title for video in videos]
+
+
+def test_schedule_is_served_from_memory_until_the_next_boundary(
+    app_db, query_counter
+):
+    add_session(app_db, "live", NOW - 600, NOW + 600)
+    add_session(app_db, "soon", NOW + 300, NOW + 900)
+    add_session(app_db, "later", NOW + 2 * 86400, NOW + 2 * 86400 + 600)
+    cache = ScheduleCache()
+    query_counter.clear()
+
+    snapshot = cache.snapshot(NOW)
+    queries = len(query_counter)
+    assert titles(snapshot.live) == ["live"]
+    assert [
+        titles(videos) for videos in snapshot.split_upcoming(NOW + 86400)
+    ] == [["soon"], ["later"]]
+    # Detached but fully loaded
+    assert [presenter.name for presenter in snapshot.live[0].presenters] == [
+        "live presenter"
+    ]
+
+    assert cache.snapshot(NOW + 299) is snapshot
+    assert len(query_counter) == queries
+
+    # "soon" starts
+    rebuilt = cache.snapshot(NOW + 300)
+    assert rebuilt is not snapshot
+    assert titles(rebuilt.live) == ["live", "soon"]
+
+
+def test_invalidate_drops_the_snapshot(app_db):
+    add_session(app_db, "live", NOW - 600, NOW + 600)
+    cache = ScheduleCache()
+    assert titles(cache.snapshot(NOW).live) == ["live"]
+
+    add_session(app_db, "also live", NOW - 60, NOW + 60)
+    assert titles(cache.snapshot(NOW).live) == ["live"]
+
+    cache.invalidate()
+    assert sorted(titles(cache.snapshot(NOW).live)) == ["also live", "live"]
@@ -0,0 +1,144 @@
+import pytest
+from models.video import Video
+from models.presenter import Presenter
+from models.tag import Tag, TagCategory
+from webapp.repositories.video_repository import VideoRepository
+
+
+def add_videos(session, count):
+    topic = TagCategory(name="Topic")
+    event = TagCategory(name="Event")
+    for i in range(count):
+        video = Video(
+            title=f"Video {i}",
+            unixstart=1700000000 + i * 3600,
+            unixend=1700000000 + i * 3600 + 1800,
+            recording=f"https://example.com/recording/{i}",
+        )
+        video.presenters = [
+            Presenter(name=f"Presenter {i}", hrc_id=f"hrc-{i}"),
+            Presenter(name=f"Co-presenter {i}", hrc_id=f"hrc-co-{i}"),
+        ]
+        video.tags = [
+            Tag(name=f"Topic {i}", category=topic),
+            Tag(name=f"Event {i}", category=event),
+        ]
+        session.add(video)
+    session.commit()
+    session.expunge_all()
+
+
+def render_cards(videos):
+    # Touch everything shared/_video_card.html reads from a video
+    for video in videos:
+        [presenter.name for presenter in video.presenters]
+        [(tag.name, tag.category.name) for tag in video.tags]
+
+
+@pytest.mark.parametrize("count", [1, 5, 25])
+def test_recorded_videos_listing_has_bounded_query_count(
+    app_db, query_counter, count
+):
+    add_videos(app_db, count)
+    query_counter.clear()
+
+    videos = VideoRepository.get_recorded_videos_after(None, count)
+    render_cards(videos)
+
+    assert len(videos) == count
+    # Videos, presenters and tags (joined with their category)
+    assert len(query_counter) == 3
+
+
+def test_videos_by_ids_have_bounded_query_count(app_db, query_counter):
+    add_videos(app_db, 30)
+    query_counter.clear()
+
+    videos = VideoRepository.get_videos_by_ids(list(range(13, 25)))
+    render_cards(videos)
+
+    assert len(videos) == 12
+    assert len(query_counter) == 3
+
+
+def test_keyset_pages_cover_every_recorded_video_once(app_db, query_counter):
+    add_videos(app_db, 30)
+    # Same start time, ordered by id
+    app_db.query(Video).filter(Video.id > 20).update(
+        {Video.unixstart: 1800000000}
+    )
+    app_db.commit()
+    query_counter.clear()
+
+    pages = []
+    after = None
+    while True:
+        videos = VideoRepository.get_recorded_videos_after(after, 12)
+        if not videos:
+            break
+        render_cards(videos)
+        pages.append([video.id for video in videos])
+        after = (videos[-1].unixstart, videos[-1].id)
+
+    assert pages == [
+        [30, 29, 28, 27, 26, 25, 24, 23, 22, 21, 20, 19],
+        list(range(18, 6, -1)),
+        list(range(6, 0, -1)),
+    ]
+    # Three queries per page, plus the empty last one
+    assert len(query_counter) == 3 * 3 + 1
+
+
+def add_searchable_videos(session):
+    topic = TagCategory(name="Topic")
+    videos = [
+        Video(
+            title="Deploying Python services", description="With Juju charms"
+        ),
+        Video(title="Scaling databases", description="PostgreSQL replication"),
+        Video(title="Python packaging"),
+        Video(title="Release notes", description="Now with Python 3.12"),
+    ]
+    videos[0].presenters = [Presenter(name="José Núñez", hrc_id="hrc-jose")]
+    videos[1].tags = [Tag(name="Kubernetes", category=topic)]
+    for i, video in enumerate(videos):
+        video.unixstart = 1700000000 + i * 3600
+        video.unixend = video.unixstart + 1800
+    session.add_all(videos)
+    session.commit()
+    session.expunge_all()
+
+
+def search(*terms):
+    return VideoRepository.get_video_ids_by_search_terms(list(terms))
+
+
+def test_search_matches_every_word_as_a_prefix(app_db):
+    add_searchable_videos(app_db)
+
+    # Newest first without a search vector
+    assert search("pyth") == [4, 3, 1]
+    assert search("python", "juju") == [1]
+    assert search("python services") == [1]
+    # Presenter and tag names, accents removed
+    assert search("nunez") == [1]
+    assert search("kube") == [2]
+    # Words only match from their start
+    assert search("thon") == []
+    assert search("", "!!") == []
+
+
+@pytest.mark.postgres
+def test_search_ranks_with_the_search_vector(postgres_db):
+    add_searchable_videos(postgres_db)
+    ids = [
+        video.id
+        for video in postgres_db.query(Video).order_by(Video.unixstart)
+    ]
+
+    # Title matches rank above description ones, then newest first
+    assert search("pyth") == [ids[2], ids[0], ids[3]]
+    assert search("python", "juju") == [ids[0]]
+    assert search("nunez") == [ids[0]]
+    assert search("kube") == [ids[1]]
+    assert search("thon") == []
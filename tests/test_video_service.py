@@ -0,0 +1,166 @@
+from models.video import Video
+from models.presenter import Presenter
+from models.tag import Tag, TagCategory
+from webapp.services.facet_index import facet_index
+from webapp.services.video_service import VideoService
+
+DAY = 1700000000
+
+
+def add_event_videos(session):
+    event = TagCategory(name="Event")
+    sprint = Tag(name="Roadmap Sprint", category=event)
+    other = Tag(name="Other Sprint", category=event)
+    # A talk every half hour, alternating between the two events
+    for i in range(24):
+        video = Video(
+            title=f"Talk {i}",
+            unixstart=DAY + i * 1800,
+            unixend=DAY + i * 1800 + 1500,
+        )
+        video.presenters = [
+            Presenter(name=f"Presenter {i}", hrc_id=f"hrc-{i}")
+        ]
+        video.tags = [sprint if i % 2 == 0 else other]
+        session.add(video)
+    session.commit()
+    session.expunge_all()
+
+
+def test_event_sessions_are_filled_from_one_query(app_db, query_counter):
+    add_event_videos(app_db)
+    query_counter.clear()
+
+    # Twelve one hour sessions
+    time_ranges = [(DAY + i * 3600, DAY + (i + 1) * 3600) for i in range(12)]
+    sessions = VideoService().get_videos_for_sessions(
+        "Roadmap Sprint", time_ranges
+    )
+
+    assert [[video.title for video in videos] for videos in sessions] == [
+        [f"Talk {i * 2}"] for i in range(12)
+    ]
+    for videos in sessions:
+        [presenter.name for presenter in videos[0].presenters]
+    # Videos, presenters and tags, whatever the number of sessions
+    assert len(query_counter) == 3
+
+
+def test_overlapping_and_empty_sessions(app_db):
+    add_event_videos(app_db)
+
+    sessions = VideoService().get_videos_for_sessions(
+        None,
+        [
+            (DAY, DAY + 3600),
+            (DAY + 1800, DAY + 3600),
+            (DAY - 3600, DAY),
+        ],
+    )
+
+    assert [[video.title for video in videos] for videos in sessions] == [
+        ["Talk 0", "Talk 1"],
+        ["Talk 1"],
+        [],
+    ]
+
+
+def test_random_video_fetches_a_single_row(app_db, query_counter):
+    add_event_videos(app_db)
+    recorded = app_db.query(Video).filter(Video.id <= 5).all()
+    for video in recorded:
+        video.recording = f"https://example.com/{video.id}"
+    app_db.commit()
+    facet_index.snapshot()
+    query_counter.clear()
+
+    picks = {VideoService().get_random_video() for _ in range(50)}
+
+    assert picks <= {
+        (video_id, f"Talk {video_id - 1}") for video_id in range(1, 6)
+    }
+    assert len(query_counter) == 50
+
+
+def test_cursor_pages_match_numbered_pages(app_db):
+    add_event_videos(app_db)
+    for video in app_db.query(Video).all():
+        video.recording = f"https://example.com/{video.id}"
+    app_db.commit()
+    service = VideoService()
+    sprint_ids = service.get_tag_ids_by_slugs(["roadmap-sprint"])
+
+    numbered = [
+        service.search_videos("", [], sprint_ids, [], [], page, 5)
+        for page in (1, 2, 3)
+    ]
+
+    after = None
+    for page, (videos, total, _) in enumerate(numbered, start=1):
+        cursor_videos, cursor_total, cursor_page = service.search_videos(
+            "", [], sprint_ids, [], [], 1, 5, after=after
+        )
+        assert [video.id for video in cursor_videos] == [
+            video.id for video in videos
+        ]
+        assert (cursor_total, cursor_page) == (total, page) == (12, page)
+        after = (videos[-1].unixstart, videos[-1].id)
+
+
+def test_search_totals_match_a_count_without_counting(app_db, query_counter):
+    add_event_videos(app_db)
+    for video in app_db.query(Video).filter(Video.id % 3 != 0).all():
+        video.recording = f"https://example.com/{video.id}"
+    app_db.commit()
+    service = VideoService()
+    sprint_ids = service.get_tag_ids_by_slugs(["roadmap-sprint"])
+    filtered = (
+        app_db.query(Video)
+        .filter(Video.recording.isnot(None))
+        .filter(Video.tags.any(Tag.id.in_(sprint_ids)))
+        .order_by(Video.unixstart.desc(), Video.id.desc())
+    )
+    expected = [video.id for video in filtered.all()], filtered.count()
+    facet_index.snapshot()
+    query_counter.clear()
+
+    pages = [
+        service.search_videos("", [], sprint_ids, [], [], page, 3)
+        for page in (1, 2, 3)
+    ]
+
+    assert (
+        [video.id for videos, _, _ in pages for video in videos],
+        pages[0][1],
+    ) == expected
+    assert not [
+        statement
+        for statement in query_counter
+        if "count(" in statement.lower()
+    ]
+
+
+def test_filter_badges_count_recorded_videos_without_querying(
+    app_db, query_counter
+):
+    add_event_videos(app_db)
+    for video in app_db.query(Video).filter(Video.id % 3 != 0).all():
+        video.recording = f"https://example.com/{video.id}"
+    app_db.commit()
+    service = VideoService()
+    facet_index.snapshot()
+    query_counter.clear()
+
+    events = service.get_tags_by_category("Event")
+    presenters = service.get_presenters_with_videos()
+
+    # Videos 3, 6, ... are not recorded, Roadmap Sprint has the odd ids
+    assert [(tag.name, tag.count) for tag in events] == [
+        ("Other Sprint", 8),
+        ("Roadmap Sprint", 8),
+    ]
+    assert len(presenters) == 16
+    assert {presenter.count for presenter in presenters} == {1}
+    assert "Presenter 2" not in {presenter.name for presenter in presenters}
+    assert service.get_tags_by_category("Topic") == []
+    assert query_counter == []
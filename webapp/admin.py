@@ -13,6 +13,10 @@ from models.presenter import Presenter
 from models.tag import Tag, TagCategory
 from models.associations import VideoPresenter, VideoTag
 from webapp.database import db_session
+from webapp.invalidation import invalidation_bus
+from webapp.repositories.video_repository import VideoRepository
+from webapp.utils.json_utils import stream_json
+from webapp.utils.text_utils import render_markdown
 from models.submission import VideoSubmission
 from markupsafe import Markup
 import flask
@@ -25,6 +29,9 @@ import csv
 import io
 import json
 
+# Rows an export fetches from the server side cursor at a time
+EXPORT_BATCH_SIZE = 500
+
 class RestrictedModelView(ModelView):
     # Admin view is accessible to Web&Design team
     def is_accessible(self):
@@ -37,6 +44,25 @@ class RestrictedModelView(ModelView):
             return url.rstrip('/')  # Remove trailing slash
         return super(RestrictedModelView, self).get_url(endpoint, **kwargs)
 
+    def after_model_change(self, form, model, is_created):
+        # Drop the cached listings in every replica once the change is
+        # committed
+        invalidation_bus.publish(self.model.__tablename__)
+
+    def after_model_delete(self, model):
+        invalidation_bus.publish(self.model.__tablename__)
+
+    def export_response(self, items, filename):
+        """
+        Download of `items` as a JSON array, written as they are produced so
+        an export of any size runs in constant memory. `?pretty` indents it.
+        """
+        response = stream_json(items, indent='pretty' in request.args)
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename={filename}"
+        )
+        return response
+
 class TagModelView(RestrictedModelView):
     column_list = ['name', 'category']
     form_columns = ['name', 'category']
@@ -77,6 +103,7 @@ class TagModelView(RestrictedModelView):
             self.session.add(model)
             self._on_model_change(form, model, True)
             self.session.commit()
+            self.after_model_change(form, model, True)
             return model
         except Exception as ex:
             if not self.handle_view_exception(ex):
@@ -99,6 +126,7 @@ class TagModelView(RestrictedModelView):
 
             self._on_model_change(form, model, False)
             self.session.commit()
+            self.after_model_change(form, model, False)
             return True
         except Exception as ex:
             if not self.handle_view_exception(ex):
@@ -152,6 +180,7 @@ class TagModelView(RestrictedModelView):
                     db_session.add(tag)
 
             db_session.commit()
+            invalidation_bus.publish('tag')
             flash('Tags imported successfully', 'success')
 
         except Exception as e:
@@ -163,30 +192,22 @@ class TagModelView(RestrictedModelView):
 
     @expose('/export-json', methods=['GET'])
     def export_json(self):
-        try:
-            # Query all tags with their categories
-            tags = db_session.query(Tag, TagCategory).join(TagCategory).order_by(TagCategory.name, Tag.name).all()
 
-            # Create JSON data
-            tag_list = []
-            for tag, category in tags:
-                tag_data = {
+        def tags():
+            # Query all tags with their categories
+            rows = (
+                db_session.query(Tag, TagCategory)
+                .join(TagCategory)
+                .order_by(TagCategory.name, Tag.name)
+                .yield_per(EXPORT_BATCH_SIZE)
+            )
+            for tag, category in rows:
+                yield {
                     'name': tag.name,
                     'category': category.name
                 }
-                tag_list.append(tag_data)
-
-            # Create the response
-            response = flask.make_response(json.dumps(tag_list, indent=2))
-            response.headers["Content-Disposition"] = "attachment; filename=tags.json"
-            response.headers["Content-type"] = "application/json"
 
-            return response
-
-        except Exception as e:
-            log.error(f"Error exporting JSON: {e}")
-            flash('Error exporting JSON file', 'error')
-            return redirect(url_for('.index_view'))
+        return self.export_response(tags(), 'tags.json')
 
 class TagCategoryModelView(RestrictedModelView):
     column_list = ['name', 'tags']
@@ -231,6 +252,7 @@ class TagCategoryModelView(RestrictedModelView):
                     db_session.add(category)
 
             db_session.commit()
+            invalidation_bus.publish('tag_category')
             flash('Categories imported successfully', 'success')
 
         except Exception as e:
@@ -242,29 +264,15 @@ class TagCategoryModelView(RestrictedModelView):
 
     @expose('/export-json', methods=['GET'])
     def export_json(self):
-        try:
-            # Query all categories
-            categories = db_session.query(TagCategory).order_by(TagCategory.name).all()
 
-            # Create JSON data
-            category_list = []
-            for category in categories:
-                category_data = {
+        def categories():
+            query = db_session.query(TagCategory).order_by(TagCategory.name)
+            for category in query.yield_per(EXPORT_BATCH_SIZE):
+                yield {
                     'name': category.name
                 }
-                category_list.append(category_data)
 
-            # Create the response
-            response = flask.make_response(json.dumps(category_list, indent=2))
-            response.headers["Content-Disposition"] = "attachment; filename=tag_categories.json"
-            response.headers["Content-type"] = "application/json"
-
-            return response
-
-        except Exception as e:
-            log.error(f"Error exporting JSON: {e}")
-            flash('Error exporting JSON file', 'error')
-            return redirect(url_for('.index_view'))
+        return self.export_response(categories(), 'tag_categories.json')
 
 class DashboardView(AdminIndexView):
     def is_visible(self):
@@ -671,6 +679,7 @@ class VideoModelView(RestrictedModelView):
             self.session.add(model)
             self._on_model_change(form, model, True)
             self.session.commit()
+            self.after_model_change(form, model, True)
             return model
         except Exception as ex:
             if not self.handle_view_exception(ex):
@@ -893,6 +902,7 @@ class VideoModelView(RestrictedModelView):
 
             self._on_model_change(form, model, False)
             self.session.commit()
+            self.after_model_change(form, model, False)
             return True
         except Exception as ex:
             if not self.handle_view_exception(ex):
@@ -956,6 +966,7 @@ class VideoModelView(RestrictedModelView):
                     # Update basic fields
                     video.title = video_data['title']
                     video.description = video_data.get('description', '')  # Set empty string as default if missing
+                    video.description_html = render_markdown(video.description)
                     video.unixstart = unixstart
                     video.unixend = unixend
                     video.stream = video_data.get('stream')
@@ -1006,6 +1017,7 @@ class VideoModelView(RestrictedModelView):
                     continue
 
             db_session.commit()
+            invalidation_bus.publish('videos')
 
             # Create summary message
             summary = []
@@ -1087,18 +1099,20 @@ class VideoModelView(RestrictedModelView):
 
     @expose('/export-json', methods=['GET'])
     def export_json(self):
-        try:
-            # Query all videos with their relationships
-            videos = db_session.query(Video).order_by(Video.unixstart.desc()).all()
 
-            # Create JSON data
-            video_list = []
-            for video in videos:
+        def videos():
+            # Presenters and tags are loaded a batch of videos at a time
+            query = (
+                db_session.query(Video)
+                .options(*VideoRepository.listing_options())
+                .order_by(Video.unixstart.desc())
+            )
+            for video in query.yield_per(EXPORT_BATCH_SIZE):
                 # Format timestamps
                 start_time = datetime.fromtimestamp(video.unixstart).strftime('%Y-%m-%d %H:%M')
                 end_time = datetime.fromtimestamp(video.unixend).strftime('%Y-%m-%d %H:%M')
 
-                video_data = {
+                yield {
                     'title': video.title,
                     'description': video.description or '',
                     'start_time': start_time,
@@ -1109,22 +1123,14 @@ class VideoModelView(RestrictedModelView):
                     'chat_log': video.chat_log or '',
                     'thumbnails': video.thumbnails or '',
                     'calendar_event': video.calendar_event or '',
-                    'presenters': [p.name for p in video.presenters] if video.presenters else [],
-                    'tags': [{'name': t.name, 'category': t.category.name} for t in video.tags] if video.tags else []
+                    'presenters': [p.name for p in video.presenters],
+                    'tags': [
+                        {'name': t.name, 'category': t.category.name}
+                        for t in video.tags
+                    ],
                 }
-                video_list.append(video_data)
-
-            # Create the response
-            response = flask.make_response(json.dumps(video_list, indent=2))
-            response.headers["Content-Disposition"] = "attachment; filename=videos.json"
-            response.headers["Content-type"] = "application/json"
-
-            return response
 
-        except Exception as e:
-            log.error(f"Error exporting JSON: {e}")
-            flash('Error exporting JSON file', 'error')
-            return redirect(url_for('.index_view'))
+        return self.export_response(videos(), 'videos.json')
 
     @property
     def location_tags(self):
@@ -1135,6 +1141,9 @@ class VideoModelView(RestrictedModelView):
         """Handle form submission and update relationships."""
         # ... existing tag handling code ...
 
+        # Render the description once here rather than on every page view
+        model.description_html = render_markdown(model.description)
+
         # Update tags
         model.tags = []
 
@@ -1272,6 +1281,7 @@ class PresenterModelView(RestrictedModelView):
                         presenter.headshot = presenter_data['headshot']
 
             db_session.commit()
+            invalidation_bus.publish('presenters')
             flash('Presenters imported successfully', 'success')
 
         except Exception as e:
@@ -1283,32 +1293,18 @@ class PresenterModelView(RestrictedModelView):
 
     @expose('/export-json', methods=['GET'])
     def export_json(self):
-        try:
-            # Query all presenters
-            presenters = db_session.query(Presenter).order_by(Presenter.name).all()
 
-            # Create JSON data
-            presenter_list = []
-            for presenter in presenters:
-                presenter_data = {
+        def presenters():
+            query = db_session.query(Presenter).order_by(Presenter.name)
+            for presenter in query.yield_per(EXPORT_BATCH_SIZE):
+                yield {
                     'name': presenter.name,
                     'email': presenter.email or '',
                     'hrc_id': presenter.hrc_id,
                     'headshot': presenter.headshot or ''
                 }
-                presenter_list.append(presenter_data)
 
-            # Create the response
-            response = flask.make_response(json.dumps(presenter_list, indent=2))
-            response.headers["Content-Disposition"] = "attachment; filename=presenters.json"
-            response.headers["Content-type"] = "application/json"
-
-            return response
-
-        except Exception as e:
-            log.error(f"Error exporting JSON: {e}")
-            flash('Error exporting JSON file', 'error')
-            return redirect(url_for('.index_view'))
+        return self.export_response(presenters(), 'presenters.json')
 
 class VideoCountFilter(BaseSQLAFilter):
     def apply(self, query, value):
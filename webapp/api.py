@@ -1,66 +1,397 @@
-from flask import Blueprint, jsonify
-from webapp.database import db_session
+from sqlalchemy.orm import joinedload
+from flask import Blueprint, request, url_for
 from models.presenter import Presenter
+from models.tag import Tag
+from models.video import Video
 from webapp.auth import require_api_token
+from webapp.repositories.change_repository import ChangeRepository
+from webapp.repositories.presenter_repository import PresenterRepository
+from webapp.repositories.video_repository import VideoRepository
+from webapp.services.video_service import VideoService
+from webapp.utils.cursors import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from webapp.utils.json_utils import json_response, stream_json
 
 api = Blueprint("api", __name__)
 
+PRESENTER_FIELDS = ('id', 'name', 'hrc_id', 'email')
+TALK_FIELDS = (
+    'id',
+    'title',
+    'description',
+    'start_time',
+    'end_time',
+    'recording_url',
+    'slides_url',
+    'presenters',
+    'tags',
+)
+MAX_LIMIT = 500
+# Presenters looked up by one batch talks request
+MAX_BATCH = 500
+
+
+def requested_fields(available_fields):
+    """The `fields` query parameter, all of `available_fields` if absent."""
+    if not request.args.get('fields'):
+        return available_fields
+
+    fields = tuple(
+        field for field in request.args['fields'].split(',') if field
+    )
+    unknown = [field for field in fields if field not in available_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def listing_args(
+    available_fields, cursor_length, default_limit=None, max_limit=MAX_LIMIT
+):
+    """
+    The `fields`, `limit` and `cursor` query parameters of a listing, as
+    (fields, limit, sort key to start after). Raises ValueError on bad input.
+    """
+    fields = requested_fields(available_fields)
+
+    limit = request.args.get('limit', default_limit, type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), max_limit)
+
+    after = None
+    if request.args.get('cursor'):
+        after = decode_cursor(request.args['cursor'], length=cursor_length)
+
+    return fields, limit, after
+
+
+def talk_json(video, fields, presenter_key='hrc_id'):
+    values = {
+        'id': lambda: video.id,
+        'title': lambda: video.title,
+        'description': lambda: video.description,
+        'start_time': lambda: video.unixstart,
+        'end_time': lambda: video.unixend,
+        'recording_url': lambda: video.recording,
+        'slides_url': lambda: video.slides,
+        'presenters': lambda: [
+            {'name': p.name, presenter_key: getattr(p, presenter_key)}
+            for p in video.presenters
+        ],
+        'tags': lambda: [
+            {'name': t.name, 'category': t.category.name} for t in video.tags
+        ],
+    }
+    return {field: values[field]() for field in fields}
+
+
+def presenter_talks(presenter, presenter_key):
+    try:
+        fields, limit, after = listing_args(TALK_FIELDS, cursor_length=2)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+
+    if limit is None:
+
+        def talks():
+            for video in VideoRepository.iter_presenter_videos(
+                presenter.id, after
+            ):
+                yield talk_json(video, fields, presenter_key)
+
+        return stream_json(
+            talks(), prefix='{"talks":', suffix=',"next_cursor":null}'
+        )
+
+    # One extra video tells whether there is a next page
+    videos = VideoRepository.iter_presenter_videos(
+        presenter.id, after, limit + 1
+    )
+    next_cursor = None
+    if len(videos) > limit:
+        videos = videos[:limit]
+        next_cursor = encode_cursor(videos[-1].unixstart, videos[-1].id)
+
+    return json_response(
+        {
+            'talks': [
+                talk_json(video, fields, presenter_key) for video in videos
+            ],
+            'next_cursor': next_cursor,
+        }
+    )
+
+
 # Get all presenters
 @api.route("/v1/presenters", methods=['GET'])
 @require_api_token
 def get_presenters():
-    presenters = db_session.query(Presenter).all()
-    return jsonify([{'id': p.id, 'name': p.name, 'hrc_id': p.hrc_id, 'email': p.email} for p in presenters])
+    try:
+        fields, limit, after = listing_args(PRESENTER_FIELDS, cursor_length=1)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+
+    # Only the requested columns, plus the id cursors are made of
+    columns = [
+        getattr(Presenter, field) for field in dict.fromkeys(('id',) + fields)
+    ]
+    after_id = after[0] if after else None
+
+    if limit is None:
+
+        def presenters():
+            for row in PresenterRepository.iter_presenter_rows(
+                columns, after_id
+            ):
+                yield {field: row._mapping[field] for field in fields}
+
+        return stream_json(presenters())
+
+    rows = PresenterRepository.iter_presenter_rows(
+        columns, after_id, limit + 1
+    )
+    response = json_response(
+        [
+            {field: row._mapping[field] for field in fields}
+            for row in rows[:limit]
+        ]
+    )
+    if len(rows) > limit:
+        # The page stays a plain list, the next one is linked from the headers
+        next_url = url_for(
+            '.get_presenters',
+            cursor=encode_cursor(rows[limit - 1].id),
+            limit=limit,
+            fields=request.args.get('fields'),
+            _external=True,
+        )
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 # Get a presenter by ID
 @api.route("/v1/presenters/<id>", methods=['GET'])
 @require_api_token
 def get_presenter(id):
-    presenter = db_session.query(Presenter).filter_by(id=id).first()
-    return jsonify({'id': presenter.id, 'name': presenter.name, 'hrc_id': presenter.hrc_id, 'email': presenter.email})
+    presenter = PresenterRepository.get_presenter_by_id(id)
+
+    if not presenter:
+        return json_response({'error': 'Presenter not found'}), 404
+
+    return json_response(
+        {
+            'id': presenter.id,
+            'name': presenter.name,
+            'hrc_id': presenter.hrc_id,
+            'email': presenter.email,
+        }
+    )
 
 # Get all talks for a presenter by HRC ID
 @api.route("/v1/presenters/<hrc_id>/talks", methods=['GET'])
 @require_api_token
 def get_presenter_talks(hrc_id):
-    presenter = db_session.query(Presenter).filter_by(hrc_id=hrc_id).first()
-    
+    presenter = PresenterRepository.get_presenter_by_hrc_id(hrc_id)
+
     if not presenter:
-        return jsonify({'error': 'Presenter not found'}), 404
-        
-    return jsonify({
-        'talks': [{
-            'id': video.id,
-            'title': video.title,
-            'description': video.description,
-            'start_time': video.unixstart,
-            'end_time': video.unixend,
-            'recording_url': video.recording,
-            'slides_url': video.slides,
-            'presenters': [{'name': p.name, 'hrc_id': p.hrc_id} for p in video.presenters],
-            'tags': [{'name': t.name, 'category': t.category.name} for t in video.tags]
-        } for video in presenter.videos]
-    })
+        return json_response({'error': 'Presenter not found'}), 404
+
+    return presenter_talks(presenter, presenter_key='hrc_id')
 
 # Get all talks for a presenter by email
 @api.route("/v1/presenters/email/<email>/talks", methods=['GET'])
 @require_api_token
 def get_presenter_talks_by_email(email):
-    presenter = db_session.query(Presenter).filter_by(email=email).first()
-    
+    presenter = PresenterRepository.get_presenter_by_email(email)
+
     if not presenter:
-        return jsonify({'error': 'Presenter not found'}), 404
-        
-    return jsonify({
-        'talks': [{
-            'id': video.id,
-            'title': video.title,
-            'description': video.description,
-            'start_time': video.unixstart,
-            'end_time': video.unixend,
-            'recording_url': video.recording,
-            'slides_url': video.slides,
-            'presenters': [{'name': p.name, 'email': p.email} for p in video.presenters],
-            'tags': [{'name': t.name, 'category': t.category.name} for t in video.tags]
-        } for video in presenter.videos]
-    })
\ No newline at end of file
+        return json_response({'error': 'Presenter not found'}), 404
+
+    return presenter_talks(presenter, presenter_key='email')
+
+
+# Get the talks of many presenters by HRC ID and/or email
+@api.route("/v1/presenters/talks", methods=['POST'])
+@require_api_token
+def get_presenters_talks():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return (
+            json_response(
+                {'error': 'Expected a JSON object with hrc_ids and/or emails'}
+            ),
+            400,
+        )
+
+    identifiers = {}
+    for key in ('hrc_ids', 'emails'):
+        values = body.get(key, [])
+        if not isinstance(values, list) or not all(
+            isinstance(value, str) for value in values
+        ):
+            return (
+                json_response({'error': f'{key} must be a list of strings'}),
+                400,
+            )
+        identifiers[key] = list(dict.fromkeys(values))
+
+    if len(identifiers['hrc_ids']) + len(identifiers['emails']) > MAX_BATCH:
+        return (
+            json_response(
+                {'error': f'At most {MAX_BATCH} presenters per request'}
+            ),
+            400,
+        )
+
+    try:
+        fields = requested_fields(TALK_FIELDS)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+
+    presenters = PresenterRepository.get_presenters_by_identifiers(
+        identifiers['hrc_ids'], identifiers['emails']
+    )
+    videos_by_presenter = VideoRepository.get_videos_by_presenter_ids(
+        [presenter.id for presenter in presenters]
+    )
+
+    # The oldest presenter wins when an email is shared
+    by_hrc_id = {}
+    by_email = {}
+    for presenter in presenters:
+        by_hrc_id.setdefault(presenter.hrc_id, presenter)
+        by_email.setdefault(presenter.email, presenter)
+
+    def talks(presenter, presenter_key):
+        if presenter is None:
+            return None
+        return {
+            'talks': [
+                talk_json(video, fields, presenter_key)
+                for video in videos_by_presenter[presenter.id]
+            ]
+        }
+
+    return json_response(
+        {
+            'hrc_ids': {
+                hrc_id: talks(by_hrc_id.get(hrc_id), 'hrc_id')
+                for hrc_id in identifiers['hrc_ids']
+            },
+            'emails': {
+                email: talks(by_email.get(email), 'email')
+                for email in identifiers['emails']
+            },
+        }
+    )
+
+
+# Get recorded videos, newest first, a page at a time
+@api.route("/v1/videos", methods=['GET'])
+@require_api_token
+def get_videos():
+    try:
+        fields, limit, after = listing_args(
+            TALK_FIELDS, cursor_length=2, default_limit=50, max_limit=100
+        )
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+
+    # One extra video tells whether there is a next page
+    videos, total = VideoService().get_recorded_videos_page(after, limit + 1)
+    next_cursor = None
+    if len(videos) > limit:
+        videos = videos[:limit]
+        next_cursor = encode_cursor(videos[-1].unixstart, videos[-1].id)
+
+    return json_response(
+        {
+            'videos': [talk_json(video, fields) for video in videos],
+            'next_cursor': next_cursor,
+            'total': total,
+        }
+    )
+
+
+# (key, model, loader options, JSON of a row) of each change feed
+CHANGE_FEEDS = (
+    (
+        'videos',
+        Video,
+        VideoRepository.listing_options(),
+        lambda video: talk_json(video, TALK_FIELDS),
+    ),
+    (
+        'presenters',
+        Presenter,
+        (),
+        lambda presenter: {
+            field: getattr(presenter, field) for field in PRESENTER_FIELDS
+        },
+    ),
+    (
+        'tags',
+        Tag,
+        (joinedload(Tag.category),),
+        lambda tag: {
+            'id': tag.id,
+            'name': tag.name,
+            'category': tag.category.name,
+        },
+    ),
+)
+
+
+def change_positions(cursor):
+    """The (change_seq, id) reached in each change feed, from a cursor."""
+    key = decode_cursor(cursor, length=2 * len(CHANGE_FEEDS))
+    # Values beyond 64 bits cannot be compared by the database
+    if not all(0 <= value < 2**63 for value in key):
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}")
+    return list(zip(key[::2], key[1::2]))
+
+
+# Get the videos, presenters and tags changed since the previous call
+@api.route("/v1/changes", methods=['GET'])
+@require_api_token
+def get_changes():
+    limit = min(max(request.args.get('limit', 100, type=int), 1), MAX_LIMIT)
+    # The (change_seq, id) reached in each feed
+    positions = [(0, 0)] * len(CHANGE_FEEDS)
+    if request.args.get('since'):
+        try:
+            positions = change_positions(request.args['since'])
+        except ValueError as e:
+            return json_response({'error': str(e)}), 400
+
+    # Changes running transactions are still writing wait for the next call
+    horizon = ChangeRepository.get_horizon()
+    changes = {}
+    next_positions = []
+    has_more = False
+    for (name, model, options, row_json), after in zip(
+        CHANGE_FEEDS, positions
+    ):
+        rows = ChangeRepository.get_changed(
+            model, after, limit + 1, options, horizon
+        )
+        has_more = has_more or len(rows) > limit
+        rows = rows[:limit]
+
+        changes[name] = [
+            {**row_json(row), 'updated_at': row.updated_at.isoformat() + 'Z'}
+            for row in rows
+        ]
+        next_positions.extend(
+            (rows[-1].change_seq, rows[-1].id) if rows else after
+        )
+
+    return json_response(
+        {
+            **changes,
+            'next_cursor': encode_cursor(*next_positions),
+            'has_more': has_more,
+        }
+    )
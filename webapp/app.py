@@ -1,12 +1,8 @@
-import os
 import flask
-import yaml
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 from canonicalwebteam.flask_base.app import FlaskBase
-from slugify import slugify as py_slugify
 from datetime import datetime, timezone
-from markdown import markdown
 from flask_apscheduler import APScheduler
 from scripts.update_presenters import update_presenters
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -15,6 +11,7 @@ from zoneinfo import ZoneInfo
 from webapp.masterclasses import masterclasses
 from webapp.sso import init_sso
 from webapp.database import db_session
+from webapp.invalidation import invalidation_bus
 from webapp.admin import (
     Admin, DashboardView, VideoModelView,
     RestrictedModelView, TagModelView, TagCategoryModelView,
@@ -25,6 +22,11 @@ from models.presenter import Presenter
 from models.tag import Tag, TagCategory
 from models.submission import VideoSubmission
 from webapp.api import api
+from webapp.services.video_service import VideoService
+from webapp.services.event_registry import event_registry, InvalidEventError
+from webapp.services.schedule_cache import schedule_cache
+from webapp.utils.cache import LRUCache
+from webapp.utils.text_utils import render_markdown, slugify
 from webapp.forms import MasterclassSubmissionForm
 from canonicalwebteam import image_template
 from jinja2 import ChoiceLoader, FileSystemLoader
@@ -73,8 +75,11 @@ def scheduled_update_presenters():
 # Start the scheduler
 scheduler.start()
 
-def slugify(text):
-    return py_slugify(text)
+# Drop cached listings when another replica changes the data
+invalidation_bus.start_listener()
+
+# Parse and validate the event pages once
+event_registry.load_all()
 
 app.add_template_filter(slugify)
 
@@ -132,9 +137,15 @@ def video_player(video_id):
 
 @app.template_filter('markdown')
 def markdown_filter(text):
-    if not text:
-        return ''
-    return markdown(text, extensions=['extra'])
+    return render_markdown(text)
+
+
+@app.template_filter('description_html')
+def description_html_filter(video):
+    """The rendered description, saved with the video or rendered now."""
+    if video.description_html is not None:
+        return video.description_html
+    return render_markdown(video.description)
 
 @app.route("/register", methods=['GET', 'POST'])
 def register():
@@ -180,69 +191,73 @@ def register():
     )
 
 
+# Rendered event pages, most hit during sprints
+event_page_cache = LRUCache(maxsize=64, ttl=300)
+
+
 @app.route("/events/<event_slug>")
 def event_detail(event_slug):
-    yaml_path = os.path.join("events", f"{event_slug}.yaml")
+    try:
+        event = event_registry.get(event_slug)
+    except InvalidEventError as e:
+        app.logger.error(e)
+        flask.abort(500, description="Invalid or unreadable event data")
 
-    if not os.path.exists(yaml_path):
+    if event is None:
         flask.abort(404, description="Event not found")
 
-    try:
-        with open(yaml_path, "r") as f:
-            event_data = yaml.safe_load(f)
-    except (IOError, yaml.YAMLError) as e:
-        app.logger.error(f"Failed to read or parse YAML for '{event_slug}': {e}")
-        flask.abort(500, description="Invalid or unreadable event data")
+    # The page only changes when the event file or the videos change, or when
+    # a session starts or ends
+    now_unix = int(datetime.now(timezone.utc).timestamp())
+    cache_key = (
+        event_slug,
+        invalidation_bus.version,
+        schedule_cache.snapshot(now_unix).valid_until,
+    )
+    cached = event_page_cache.get(cache_key)
+    # A reloaded event file is a new object
+    if cached is not None and cached[0] is event and not app.debug:
+        return cached[1]
 
-    tag_name = event_data.get("tag")
+    tag_name = event.get("tag")
 
     # TODO: Read featured video from YAML when available (timestamp?)
     featured_video = None
 
-    # For each session, find videos within its time range
-    for day in event_data.get("days", []):
-        for session in day.get("sessions", []):
-            start_datetime = session.get("start")
-            end_datetime = session.get("end")
-
-            if not start_datetime or not end_datetime:
-                session["videos"] = []
-                app.logger.warning(f"Session '{session.get('title')}' is missing start or end time in '{event_slug}'.")
-                continue
-
-            if not isinstance(start_datetime, datetime):
-                raise TypeError(f"Value of 'start' must be a valid datetime, got {start_datetime!r}.")
-
-            if not isinstance(end_datetime, datetime):
-                raise TypeError(f"Value of 'end' must be a valid datetime, got {end_datetime!r}.")
-
-            # Convert to epoch seconds
-            start_ts = int(start_datetime.timestamp())
-            end_ts = int(end_datetime.timestamp())
-
-            # Query videos filtered by tag first (if provided)
-            query = db_session.query(Video).join(Video.tags)
-            if tag_name:
-                query = query.filter(Tag.name == tag_name)
+    # Convert to epoch seconds
+    time_ranges = [
+        (int(session["start"].timestamp()), int(session["end"].timestamp()))
+        for day in event["days"]
+        for session in day["sessions"]
+    ]
+    # Videos tagged with the event (if provided) starting within each
+    # session's time range
+    videos_by_session = iter(
+        VideoService().get_videos_for_sessions(tag_name, time_ranges)
+    )
 
-            # Filter videos where 'unixstart' is within the session's time range
-            session_videos = query.filter(
-                Video.unixstart >= start_ts,
-                Video.unixstart < end_ts
-            ).order_by(Video.unixstart).all()
+    # The registry data is shared between requests, add the videos to copies
+    days = []
+    for day in event["days"]:
+        sessions = []
+        for session in day["sessions"]:
+            session_videos = next(videos_by_session)
 
             # Use last video as featured video (should end up as "Closing plenary")
             # TODO: fix this when we have a proper way to mark featured video
             if session_videos:
                 featured_video = session_videos[-1]
 
-            session["videos"] = session_videos
-
+            sessions.append({**session, "videos": session_videos})
+        days.append({**day, "sessions": sessions})
 
+    event_data = {**event, "days": days}
     if featured_video:
         event_data["featured_video"] = featured_video
 
-    return flask.render_template("event.html", event=event_data)
+    page = flask.render_template("event.html", event=event_data)
+    event_page_cache.set(cache_key, (event, page))
+    return page
 
 @app.teardown_appcontext
 def shutdown_session(exception=None):
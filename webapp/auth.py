@@ -1,21 +1,49 @@
 from functools import wraps
-from flask import request, jsonify
+from hashlib import sha1
+from flask import request, make_response
+from webapp.repositories.change_repository import ChangeRepository
+from webapp.utils.json_utils import json_response
 import os
 
+
+def data_version():
+    """
+    ETag of the API responses: the same in every worker and replica, and
+    it changes whenever the data does, however it was written.
+    """
+    version = ChangeRepository.get_data_version()
+    return sha1(repr(version).encode()).hexdigest()
+
+
 def require_api_token(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         api_token = request.headers.get('Authorization')
         if not api_token:
-            return jsonify({'error': 'No API token provided'}), 401
-            
+            return json_response({'error': 'No API token provided'}), 401
+
         # Remove 'Bearer ' prefix if present
         if api_token.startswith('Bearer '):
             api_token = api_token[7:]
-            
+
         # Compare with environment variable
         if api_token != os.getenv('API_TOKEN'):
-            return jsonify({'error': 'Invalid API token'}), 401
-            
-        return f(*args, **kwargs)
-    return decorated_function
\ No newline at end of file
+            return json_response({'error': 'Invalid API token'}), 401
+
+        if request.method != 'GET':
+            return f(*args, **kwargs)
+
+        # Compared before running the view, so an unchanged response costs a
+        # single query. Deleting a resource changes the version too, a
+        # deleted one is never reported unchanged but gets its 404.
+        etag = data_version()
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        return response
+    return decorated_function
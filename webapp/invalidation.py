@@ -0,0 +1,170 @@
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from sqlalchemy import text
+from webapp.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "masterclasses_invalidation"
+
+# Tables whose changes affect the cached video listings
+CATALOGUE_TOPICS = ("videos", "presenters", "tag", "tag_category")
+
+
+class InvalidationEvent:
+    """
+    A change to the `topics` tables published by the process `origin`.
+
+    `version` is the data version of the receiving process after the event,
+    it goes up by one with every event seen, local or remote, so it can be
+    used in cache keys.
+    """
+
+    def __init__(self, version, topics, origin):
+        self.version = version
+        self.topics = frozenset(topics)
+        self.origin = origin
+
+    def __repr__(self):
+        return (
+            f"InvalidationEvent({self.version}, {sorted(self.topics)}, "
+            f"{self.origin!r})"
+        )
+
+
+class InvalidationBus:
+    """
+    Tells in-process caches that data changed, in this process and in the
+    other replicas.
+
+    Events are dispatched to local subscribers straight away and sent to
+    the other processes through Postgres LISTEN/NOTIFY. On other databases
+    (SQLite in development and tests) only local subscribers are notified.
+
+    `origin` and `version` together identify the state of the data as seen
+    by this process.
+    """
+
+    def __init__(self, engine, channel=CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.version = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._listener = None
+
+    @property
+    def is_shared(self):
+        return self.engine.dialect.name == "postgresql"
+
+    def subscribe(self, callback, topics=None):
+        """Call `callback(event)` on changes to `topics` (all if None)."""
+        self._subscribers.append(
+            (callback, frozenset(topics) if topics else None)
+        )
+
+    def publish(self, *topics):
+        """Announce committed changes to the `topics` tables."""
+        event = self._next_event(topics, self.origin)
+        self._dispatch(event)
+
+        if self.is_shared:
+            payload = json.dumps(
+                {"origin": self.origin, "topics": sorted(event.topics)}
+            )
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": self.channel, "payload": payload},
+                    )
+            except Exception as e:
+                # The other replicas catch up when their caches expire
+                logger.error(f"Failed to notify other replicas: {e}")
+
+        return event
+
+    def _next_event(self, topics, origin):
+        with self._lock:
+            self.version += 1
+            return InvalidationEvent(self.version, topics, origin)
+
+    def _dispatch(self, event):
+        for callback, topics in self._subscribers:
+            if topics is None or topics & event.topics:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception(
+                        f"Invalidation subscriber failed for {event}"
+                    )
+
+    def _receive(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.error(
+                f"Ignoring malformed invalidation payload: {payload!r}"
+            )
+            return
+
+        # Already dispatched locally when it was published
+        if message.get("origin") == self.origin:
+            return
+        self._dispatch(
+            self._next_event(message.get("topics", ()), message.get("origin"))
+        )
+
+    def start_listener(self):
+        """Listen for the events other processes publish, in the background."""
+        if not self.is_shared or self._listener is not None:
+            return
+
+        self._listener = threading.Thread(
+            target=self._listen, name="invalidation-listener", daemon=True
+        )
+        self._listener.start()
+
+    def _listen(self):
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                # A dedicated connection, kept out of the pool
+                connection = self.engine.raw_connection()
+                dbapi_connection = connection.driver_connection
+                connection.detach()
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+
+                if reconnecting:
+                    # Events may have been missed while disconnected
+                    self._dispatch(self._next_event(CATALOGUE_TOPICS, None))
+
+                while True:
+                    readable, _, _ = select.select(
+                        [dbapi_connection], [], [], 5
+                    )
+                    if not readable:
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self._receive(dbapi_connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(
+                    f"Invalidation listener failed, reconnecting: {e}"
+                )
+                reconnecting = True
+                time.sleep(5)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+invalidation_bus = InvalidationBus(engine)
@@ -3,7 +3,7 @@ import os
 from datetime import datetime, timezone
 
 import flask
-from sqlalchemy import and_, func
+from sqlalchemy import func
 
 from models.presenter import Presenter
 from models.submission import VideoSubmission
@@ -13,6 +13,11 @@ from webapp.database import db_session
 from webapp.forms import MasterclassRegistrationForm
 from webapp.mattermost import MattermostMessagePayload, try_send_message
 from webapp.services.video_service import VideoService
+from webapp.utils.cursors import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
 
 masterclasses = flask.Blueprint(
     "masterclasses",
@@ -26,15 +31,7 @@ logger = logging.getLogger(__name__)
 
 def get_live_videos():
     """Helper function to get currently live videos."""
-    now = datetime.now(timezone.utc)
-    now_unix = int(now.timestamp())
-
-    return db_session.query(Video).filter(
-        and_(
-            Video.unixstart <= now_unix,
-            Video.unixend >= now_unix
-        )
-    ).all()
+    return VideoService().get_live_videos()
 
 
 def get_tags_by_category(category_name):
@@ -69,27 +66,15 @@ def get_tags_by_category(category_name):
 def index():
     now = datetime.now(timezone.utc)
     now_unix = int(now.timestamp())
+    video_service = VideoService()
 
     # Live videos (started but not ended)
-    live_videos = db_session.query(Video).filter(
-        and_(
-            Video.unixstart <= now_unix,
-            Video.unixend >= now_unix
-        )
-    ).all()
-
-    # Videos in next 24 hours
-    upcoming_videos_24h = db_session.query(Video).filter(
-        and_(
-            Video.unixstart > now_unix,
-            Video.unixstart <= now_unix + 86400  # 24 hours in seconds
-        )
-    ).order_by(Video.unixstart).all()
+    live_videos = video_service.get_live_videos()
 
-    # Future videos (beyond 24 hours)
-    upcoming_videos_future = db_session.query(Video).filter(
-        Video.unixstart > now_unix + 86400
-    ).order_by(Video.unixstart).all()
+    # Videos in next 24 hours and future videos (beyond 24 hours)
+    upcoming_videos_24h, upcoming_videos_future = (
+        video_service.get_upcoming_videos(now_unix)
+    )
 
     # Query tag categories and their associated tags
     topic_tags = db_session.query(Tag).join(
@@ -139,6 +124,12 @@ def videos():
     # Get pagination parameters from request
     page = flask.request.args.get('page', 1, type=int)
     items_per_page = 12
+
+    # Next page links carry the position of the last video shown
+    try:
+        after = decode_cursor(flask.request.args['after'])
+    except (KeyError, InvalidCursorError):
+        after = None
     
     topic_filter_slugs = flask.request.args.get('topic', '').split(',')
     event_filter_slugs = flask.request.args.get('event', '').split(',')
@@ -150,21 +141,14 @@ def videos():
     date_filter_slugs = [f for f in date_filter_slugs if f]
     presenter_filter_slugs = [f for f in presenter_filter_slugs if f]
 
-    all_tags = db_session.query(Tag).all()
-    slugify = flask.current_app.jinja_env.filters['slugify']
-    
-    tag_slug_to_id = {slugify(tag.name): tag.id for tag in all_tags}
-    
-    topic_filter = [tag_slug_to_id.get(slug) for slug in topic_filter_slugs if slug in tag_slug_to_id]
-    event_filter = [tag_slug_to_id.get(slug) for slug in event_filter_slugs if slug in tag_slug_to_id]
-    date_filter = [tag_slug_to_id.get(slug) for slug in date_filter_slugs if slug in tag_slug_to_id]
-    
-    all_presenters = db_session.query(Presenter).all()
-    presenter_slug_to_id = {slugify(presenter.name): presenter.id for presenter in all_presenters}
-    presenter_filter = [presenter_slug_to_id.get(slug) for slug in presenter_filter_slugs if slug in presenter_slug_to_id]
-
-    
     video_service = VideoService()
+    topic_filter = video_service.get_tag_ids_by_slugs(topic_filter_slugs)
+    event_filter = video_service.get_tag_ids_by_slugs(event_filter_slugs)
+    date_filter = video_service.get_tag_ids_by_slugs(date_filter_slugs)
+    presenter_filter = video_service.get_presenter_ids_by_slugs(
+        presenter_filter_slugs
+    )
+
     topic_tags = video_service.get_tags_by_category('Topic')
     event_tags = video_service.get_tags_by_category('Event')
     date_tags = video_service.get_tags_by_category('Date')
@@ -174,18 +158,24 @@ def videos():
     search_query = flask.request.args.get('search', '')
     
     # Get filtered videos using the service
-    recorded_videos, total_videos = video_service.search_videos(
+    recorded_videos, total_videos, page = video_service.search_videos(
         search_query,
         topic_filter,
         event_filter,
         date_filter,
         presenter_filter,
         page,
-        items_per_page
+        items_per_page,
+        after=None if search_query else after
     )
     
     total_pages = max(1, (total_videos + items_per_page - 1) // items_per_page)
     page = min(max(1, page), total_pages)
+
+    next_cursor = None
+    if recorded_videos and page < total_pages and not search_query:
+        last_video = recorded_videos[-1]
+        next_cursor = encode_cursor(last_video.unixstart, last_video.id)
     
     active_filter_slugs = {
         'topic': topic_filter_slugs,
@@ -206,7 +196,8 @@ def videos():
             'page': page,
             'total_pages': total_pages,
             'total_items': total_videos,
-            'items_per_page': items_per_page
+            'items_per_page': items_per_page,
+            'next_cursor': next_cursor
         },
         active_filters={
             'topic': topic_filter,
@@ -221,9 +212,8 @@ def videos():
 
 @masterclasses.route("/videos/<title>-class-<id>")
 def video_player(title, id):
-    video = db_session.query(Video)\
-        .filter(Video.id == id)\
-        .first()
+    video_service = VideoService()
+    video = video_service.get_video_by_id(id)
 
     if not video:
         flask.abort(404)
@@ -239,38 +229,8 @@ def video_player(title, id):
             )
         )
 
-    # Get topic tags for the current video
-    topic_tags = [tag.id for tag in video.tags if tag.category.name == "Topic"]
-
-    # Base query for suggested videos
-    suggested_query = db_session.query(Video)\
-        .filter(Video.id != video.id)\
-        .filter(Video.recording.isnot(None))
-
-    if topic_tags:
-        # If we have topic tags, try to find videos with matching tags
-        suggested_videos = suggested_query\
-            .join(Tag, Video.tags)\
-            .join(TagCategory)\
-            .filter(TagCategory.name == "Topic")\
-            .filter(Tag.id.in_(topic_tags))\
-            .group_by(Video.id)\
-            .order_by(func.count(Tag.id).desc())\
-            .limit(3)\
-            .all()
-    else:
-        # If no topic tags, just get recent videos
-        suggested_videos = suggested_query\
-            .order_by(Video.unixstart.desc())\
-            .limit(3)\
-            .all()
-
-    # If still no suggestions, get random videos
-    if not suggested_videos:
-        suggested_videos = suggested_query\
-            .order_by(func.random())\
-            .limit(3)\
-            .all()
+    # Videos sharing topic tags, falling back to recent then random videos
+    suggested_videos = video_service.get_suggested_videos(video)
 
     # Get live videos using helper function
     live_videos = get_live_videos()
@@ -308,19 +268,17 @@ def google_drive_id(url):
 
 @masterclasses.route("/random")
 def random_video():
-    video = db_session.query(Video)\
-        .filter(Video.recording.isnot(None))\
-        .order_by(func.random())\
-        .first()
+    video = VideoService().get_random_video()
 
     if not video:
         return flask.redirect(flask.url_for('masterclasses.videos'))
 
+    video_id, title = video
     return flask.redirect(
         flask.url_for(
             'masterclasses.video_player',
-            title=flask.current_app.jinja_env.filters['slugify'](video.title),
-            id=video.id
+            title=flask.current_app.jinja_env.filters['slugify'](title),
+            id=video_id
         )
     )
 
@@ -0,0 +1,60 @@
+from sqlalchemy import func, select, text, tuple_
+from models.presenter import Presenter
+from models.tag import Tag
+from models.video import Video
+from webapp.database import db_session
+
+
+class ChangeRepository:
+    @staticmethod
+    def get_data_version():
+        """
+        A value that changes whenever the videos, presenters or tags do,
+        deletions included, whichever process, script or SQL wrote them.
+        On PostgreSQL the counter the data_version triggers bump as each
+        writing transaction commits. Elsewhere the latest change and the
+        number of rows of each table.
+        """
+        if db_session.get_bind().dialect.name == "postgresql":
+            return db_session.execute(
+                text("SELECT version FROM data_version")
+            ).scalar()
+        columns = [
+            select(aggregate).scalar_subquery()
+            for model in (Video, Presenter, Tag)
+            for aggregate in (func.max(model.updated_at), func.count(model.id))
+        ]
+        return tuple(db_session.execute(select(*columns)).one())
+
+    @staticmethod
+    def get_horizon():
+        """
+        The change_seq below which no transaction still running can stamp a
+        row. On PostgreSQL change_seq is the id of the writing transaction,
+        and this is the oldest one still running: transactions that have
+        not written anything (e.g. left idle) have no id and hold nothing
+        back. None when not on PostgreSQL, where there is no horizon.
+        """
+        if db_session.get_bind().dialect.name != "postgresql":
+            return None
+        return db_session.execute(
+            text(
+                "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+            )
+        ).scalar()
+
+    @staticmethod
+    def get_changed(model, after, limit, options=(), before=None):
+        """
+        Up to `limit` rows of `model` changed after the (change_seq, id) pair
+        `after`, and with a change_seq below `before` if given, oldest change
+        first.
+        """
+        query = (
+            db_session.query(model)
+            .options(*options)
+            .filter(tuple_(model.change_seq, model.id) > after)
+        )
+        if before is not None:
+            query = query.filter(model.change_seq < before)
+        return query.order_by(model.change_seq, model.id).limit(limit).all()
@@ -0,0 +1,52 @@
+from sqlalchemy import or_, select
+from webapp.database import db_session
+from models.presenter import Presenter
+
+
+class PresenterRepository:
+    @staticmethod
+    def get_presenter_by_id(presenter_id):
+        return db_session.query(Presenter).filter_by(id=presenter_id).first()
+
+    @staticmethod
+    def get_presenter_by_hrc_id(hrc_id):
+        return db_session.query(Presenter).filter_by(hrc_id=hrc_id).first()
+
+    @staticmethod
+    def get_presenter_by_email(email):
+        return db_session.query(Presenter).filter_by(email=email).first()
+
+    @staticmethod
+    def get_presenters_by_identifiers(hrc_ids, emails):
+        """Presenters with any of the `hrc_ids` or `emails`, in one query."""
+        conditions = []
+        if hrc_ids:
+            conditions.append(Presenter.hrc_id.in_(hrc_ids))
+        if emails:
+            conditions.append(Presenter.email.in_(emails))
+        if not conditions:
+            return []
+        return (
+            db_session.query(Presenter)
+            .filter(or_(*conditions))
+            .order_by(Presenter.id)
+            .all()
+        )
+
+    @staticmethod
+    def iter_presenter_rows(
+        columns, after_id=None, limit=None, batch_size=500
+    ):
+        """
+        Rows of the given presenter `columns` ordered by id, starting after
+        `after_id`. Without a `limit` the rows are streamed from a server
+        side cursor `batch_size` at a time instead of being fetched at once.
+        """
+        statement = select(*columns).order_by(Presenter.id)
+        if after_id is not None:
+            statement = statement.where(Presenter.id > after_id)
+        if limit is not None:
+            return db_session.execute(statement.limit(limit)).all()
+        return db_session.execute(
+            statement.execution_options(yield_per=batch_size)
+        )
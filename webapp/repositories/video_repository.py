@@ -1,88 +1,218 @@
-from datetime import datetime, timezone
-from sqlalchemy import func, and_, or_
+import re
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import selectinload
 from webapp.database import db_session
 from models.video import Video
 from models.presenter import Presenter
 from models.tag import Tag, TagCategory
+from models.associations import VideoPresenter, VideoRelated
+from webapp.utils.text_utils import tokenize
 
 class VideoRepository:
     @staticmethod
-    def get_video_by_id(video_id):
-        return db_session.query(Video).filter(Video.id == video_id).first()
+    def listing_options():
+        """
+        Loader options for the relationships every video listing renders
+        (cards, player suggestions, event sessions). Loading them up front
+        keeps the number of queries per page fixed instead of one lazy load
+        per video per relationship.
+        """
+        return (
+            selectinload(Video.presenters),
+            selectinload(Video.tags).joinedload(Tag.category),
+        )
 
     @staticmethod
-    def get_live_videos():
-        now = datetime.now(timezone.utc)
-        now_unix = int(now.timestamp())
-        
-        return db_session.query(Video).filter(
-            and_(
-                Video.unixstart <= now_unix,
-                Video.unixend >= now_unix
-            )
-        ).all()
+    def listing_query():
+        """Base query for videos that will be rendered in a listing."""
+        return db_session.query(Video).options(
+            *VideoRepository.listing_options()
+        )
 
     @staticmethod
-    def get_all_recorded_videos():
-        """Get all videos that have recordings."""
-        return (db_session.query(Video)
-                .filter(Video.recording.isnot(None))
-                .order_by(Video.unixstart.desc())
+    def get_video_by_id(video_id):
+        return (
+            VideoRepository.listing_query()
+            .filter(Video.id == video_id)
+            .first()
+        )
+
+    @staticmethod
+    def get_recorded_videos_after(after, limit):
+        """
+        Recorded videos newest first, starting after the (unixstart, id) pair
+        `after` if given. Seeks on the listing index rather than skipping
+        rows, so deep pages cost the same as the first.
+        """
+        query = VideoRepository.listing_query().filter(
+            Video.recording.isnot(None)
+        )
+        if after is not None:
+            query = query.filter(tuple_(Video.unixstart, Video.id) < after)
+        return (query
+                .order_by(Video.unixstart.desc(), Video.id.desc())
+                .limit(limit)
                 .all())
 
     @staticmethod
-    def get_videos_by_ids(video_ids):
-        return db_session.query(Video).filter(Video.id.in_(video_ids)).all()
+    def iter_presenter_videos(
+        presenter_id, after=None, limit=None, batch_size=200
+    ):
+        """
+        Videos of a presenter newest first, starting after the (unixstart, id)
+        pair `after`. Without a `limit` they are streamed `batch_size` at a
+        time, their presenters and tags loaded a batch at a time too.
+        """
+        query = VideoRepository.listing_query().filter(
+            Video.presenters.any(Presenter.id == presenter_id)
+        )
+        if after is not None:
+            query = query.filter(tuple_(Video.unixstart, Video.id) < after)
+        query = query.order_by(Video.unixstart.desc(), Video.id.desc())
+        if limit is not None:
+            return query.limit(limit).all()
+        return query.yield_per(batch_size)
+
+    @staticmethod
+    def get_videos_by_presenter_ids(presenter_ids):
+        """
+        {presenter id: videos newest first} for the given presenters, with
+        the videos' presenters and tags, in a fixed number of queries.
+        """
+        videos_by_presenter = {
+            presenter_id: [] for presenter_id in presenter_ids
+        }
+        if not presenter_ids:
+            return videos_by_presenter
+
+        rows = (
+            VideoRepository.listing_query()
+            .add_columns(VideoPresenter.presenter_id)
+            .join(VideoPresenter, VideoPresenter.video_id == Video.id)
+            .filter(VideoPresenter.presenter_id.in_(presenter_ids))
+            .order_by(Video.unixstart.desc(), Video.id.desc())
+            .all()
+        )
+        for video, presenter_id in rows:
+            videos_by_presenter[presenter_id].append(video)
+        return videos_by_presenter
 
     @staticmethod
-    def get_videos_with_filters(base_query, filters):
-        query = base_query
-        for filter_query in filters:
-            query = query.filter(filter_query)
-        return query.all()
+    def get_videos_by_ids(video_ids):
+        return (
+            VideoRepository.listing_query()
+            .filter(Video.id.in_(video_ids))
+            .all()
+        )
 
     @staticmethod
-    def get_videos_with_pagination(query, page, items_per_page):
-        return query.limit(items_per_page).offset((page - 1) * items_per_page).all()
+    def get_videos_by_tag_in_range(tag_name, start, end):
+        """Videos tagged `tag_name` (any if None) starting in [start, end)."""
+        query = VideoRepository.listing_query().join(Video.tags)
+        if tag_name:
+            query = query.filter(Tag.name == tag_name)
+        return (
+            query.filter(Video.unixstart >= start, Video.unixstart < end)
+            .order_by(Video.unixstart)
+            .all()
+        )
 
     @staticmethod
-    def get_videos_count(query):
-        return query.count()
+    def get_related_videos(video_id, limit):
+        """The first `limit` precomputed related videos, best first."""
+        return (
+            VideoRepository.listing_query()
+            .join(VideoRelated, VideoRelated.related_video_id == Video.id)
+            .filter(VideoRelated.video_id == video_id)
+            .order_by(VideoRelated.rank)
+            .limit(limit)
+            .all()
+        )
 
     @staticmethod
-    def get_videos_by_tag_category(category_name, tag_ids):
-        return (db_session.query(Video)
+    def get_suggested_videos(video, topic_tag_ids, limit):
+        """Get recorded videos sharing the most topic tags with `video`."""
+        return (VideoRepository.listing_query()
+                .filter(Video.id != video.id)
+                .filter(Video.recording.isnot(None))
                 .join(Tag, Video.tags)
                 .join(TagCategory)
-                .filter(TagCategory.name == category_name)
-                .filter(Tag.id.in_(tag_ids))
-                .distinct()
+                .filter(TagCategory.name == "Topic")
+                .filter(Tag.id.in_(topic_tag_ids))
+                .group_by(Video.id)
+                .order_by(func.count(Tag.id).desc())
+                .limit(limit)
                 .all())
 
     @staticmethod
-    def get_videos_by_presenters(presenter_ids):
-        return (db_session.query(Video)
-                .join(Video.presenters)
-                .filter(Presenter.id.in_(presenter_ids))
-                .distinct()
+    def get_recent_recorded_videos(exclude_id, limit):
+        return (VideoRepository.listing_query()
+                .filter(Video.id != exclude_id)
+                .filter(Video.recording.isnot(None))
+                .order_by(Video.unixstart.desc())
+                .limit(limit)
                 .all())
 
     @staticmethod
-    def get_videos_by_search_terms(search_terms, presenter_names, tag_names):
-        return (db_session.query(Video)
-                .outerjoin(Tag, Video.tags)
-                .outerjoin(Video.presenters)
-                .group_by(Video.id)
-                .having(
-                    or_(
-                        func.lower(func.string_agg(Presenter.name, ' ')).contains(search_terms.lower()),
-                        func.lower(func.string_agg(Tag.name, ' ')).contains(search_terms.lower()),
-                        *[
-                            or_(
-                                func.lower(Video.title).contains(term),
-                                func.lower(Video.description).contains(term)
-                            ) for term in search_terms.split()
+    def get_video_title(video_id):
+        return (
+            db_session.query(Video.title).filter(Video.id == video_id).scalar()
+        )
+
+    @staticmethod
+    def get_video_ids_by_search_terms(search_terms):
+        """
+        Ids of videos matching every word of the search terms as a word
+        prefix in their title, presenter names, tag names or description,
+        best matches first.
+
+        PostgreSQL ranks them with the full-text search vector. Other
+        databases (SQLite in development and tests) have no search vector,
+        the words are matched in Python and the videos come newest first.
+        """
+        words = [
+            word for term in search_terms for word in re.findall(r'\w+', term)
+        ]
+        if not words:
+            return []
+
+        if db_session.get_bind().dialect.name != 'postgresql':
+            videos = (
+                VideoRepository.listing_query()
+                .order_by(Video.unixstart.desc(), Video.id.desc())
+                .all()
+            )
+            video_ids = []
+            for video in videos:
+                document = tokenize(
+                    ' '.join(
+                        [
+                            video.title,
+                            *(
+                                presenter.name
+                                for presenter in video.presenters
+                            ),
+                            *(tag.name for tag in video.tags),
+                            video.description or '',
                         ]
                     )
                 )
-                .all()) 
\ No newline at end of file
+                if all(
+                    any(token.startswith(word) for token in document)
+                    for word in words
+                ):
+                    video_ids.append(video.id)
+            return video_ids
+
+        ts_query = func.to_tsquery(
+            'simple', ' & '.join(f'{word}:*' for word in words)
+        )
+        rows = (db_session.query(Video.id)
+                .filter(Video.search_vector.op('@@')(ts_query))
+                .order_by(
+                    func.ts_rank(Video.search_vector, ts_query).desc(),
+                    Video.unixstart.desc(),
+                    Video.id.desc()
+                )
+                .all())
+        return [video_id for video_id, in rows]
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date, datetime
+import yaml
+from jsonschema import Draft7Validator
+
+logger = logging.getLogger(__name__)
+
+SLUG_PATTERN = re.compile(r"[a-z0-9][a-z0-9-]*")
+
+
+class InvalidEventError(ValueError):
+    """An event file that cannot be read or parsed, or breaks the schema."""
+
+
+def to_json_types(value):
+    """Turn the dates and datetimes YAML parses back into strings."""
+    if isinstance(value, dict):
+        return {key: to_json_types(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_json_types(item) for item in value]
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class CachedEvent:
+    def __init__(self, data, mtime, checked_at):
+        self.data = data
+        self.mtime = mtime
+        self.checked_at = checked_at
+
+
+class EventRegistry:
+    """
+    Parsed and validated `events/*.yaml` files, keyed by slug.
+
+    Files are read once and only read again when their modification time
+    changes, which is checked at most every `check_interval` seconds per
+    event. Callers must not modify the returned data, it is shared between
+    requests.
+    """
+
+    def __init__(
+        self,
+        directory="events",
+        schema_file="event.schema.json",
+        check_interval=5,
+    ):
+        self.directory = directory
+        self.check_interval = check_interval
+        with open(os.path.join(directory, schema_file)) as f:
+            self.validator = Draft7Validator(json.load(f))
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        """Load every event up front, logging the invalid ones."""
+        for filename in sorted(os.listdir(self.directory)):
+            slug, extension = os.path.splitext(filename)
+            if extension != ".yaml":
+                continue
+            try:
+                self.get(slug)
+            except InvalidEventError as e:
+                logger.error(e)
+
+    def get(self, slug):
+        """The event data for `slug`, or None if there is no such event."""
+        if not SLUG_PATTERN.fullmatch(slug):
+            return None
+
+        cached = self._events.get(slug)
+        now = time.monotonic()
+        if (
+            cached is not None
+            and now - cached.checked_at < self.check_interval
+        ):
+            return cached.data
+
+        with self._lock:
+            return self._refresh(slug, now)
+
+    def _refresh(self, slug, now):
+        path = os.path.join(self.directory, f"{slug}.yaml")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._events.pop(slug, None)
+            return None
+
+        cached = self._events.get(slug)
+        if cached is not None and cached.mtime == mtime:
+            cached.checked_at = now
+            return cached.data
+
+        data = self._load(slug, path)
+        self._events[slug] = CachedEvent(data, mtime, now)
+        return data
+
+    def _load(self, slug, path):
+        try:
+            with open(path, "r") as f:
+                data = yaml.safe_load(f)
+        except (IOError, yaml.YAMLError) as e:
+            raise InvalidEventError(
+                f"Failed to read or parse YAML for '{slug}': {e}"
+            )
+
+        errors = sorted(
+            self.validator.iter_errors(to_json_types(data)), key=str
+        )
+        if errors:
+            error = errors[0]
+            location = (
+                "/".join(str(part) for part in error.absolute_path) or "(root)"
+            )
+            raise InvalidEventError(
+                f"Invalid event '{slug}' at {location}: {error.message}"
+            )
+
+        # Timestamps quoted in the YAML are still strings
+        for day in data["days"]:
+            for session in day["sessions"]:
+                for key in ("start", "end"):
+                    if isinstance(session[key], str):
+                        session[key] = datetime.fromisoformat(session[key])
+
+        return data
+
+
+event_registry = EventRegistry()
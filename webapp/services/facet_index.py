@@ -0,0 +1,302 @@
+import random
+from bisect import bisect_right
+from dataclasses import dataclass
+import threading
+import time
+from sqlalchemy import select
+from webapp.database import db_session
+from webapp.invalidation import invalidation_bus, CATALOGUE_TOPICS
+from models.video import Video
+from models.presenter import Presenter
+from models.tag import Tag, TagCategory
+from models.associations import VideoPresenter, VideoTag
+from webapp.services.fuzzy_index import FuzzyIndex
+from webapp.services.presenter_index import PresenterNameIndex
+from webapp.utils.text_utils import slugify
+
+
+def iter_positions(bitmap):
+    """Yield the positions of the set bits of `bitmap`, lowest first."""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+@dataclass(frozen=True)
+class FacetValue:
+    """A tag or presenter offered as a /videos filter."""
+
+    id: int
+    name: str
+    # Number of recorded videos carrying it
+    count: int
+
+
+class FacetSnapshot:
+    """
+    Immutable view of which recorded videos carry which tags and presenters,
+    the URL slugs of the tags and presenters, and the presenter name and
+    fuzzy word indexes used by the search fallback.
+
+    Recorded videos are ordered newest first and each facet value maps to a
+    bitmap (a Python int) where bit `n` is set if the `n`th video carries it,
+    so combining filters is a handful of integer ANDs/ORs and the bit order
+    is already the listing order. Pages can start at a position, found from
+    a (unixstart, id) cursor, instead of skipping the videos before it.
+    """
+
+    def __init__(
+        self,
+        ordered_ids,
+        ordered_starts,
+        tag_videos,
+        tag_categories,
+        presenter_videos,
+        presenter_names,
+        fuzzy,
+        tag_slugs,
+        presenter_slugs,
+        tag_labels,
+        presenter_labels,
+    ):
+        self.ordered_ids = ordered_ids
+        self.positions = {
+            video_id: pos for pos, video_id in enumerate(ordered_ids)
+        }
+        # Ascending in listing order, for bisecting
+        self.sort_keys = [
+            (-start, -video_id)
+            for start, video_id in zip(ordered_starts, ordered_ids)
+        ]
+        self.all_recorded = (1 << len(ordered_ids)) - 1
+        self.tag_categories = tag_categories
+        self.tag_bitmaps = self._bitmaps(tag_videos)
+        self.presenter_bitmaps = self._bitmaps(presenter_videos)
+        self.presenter_names = presenter_names
+        self.fuzzy = fuzzy
+        self.tag_slugs = tag_slugs
+        self.presenter_slugs = presenter_slugs
+        # Names by id, for the filter lists
+        self.tag_labels = tag_labels
+        self.presenter_labels = presenter_labels
+
+    def _bitmaps(self, facet_videos):
+        bitmaps = {}
+        for facet_id, video_ids in facet_videos.items():
+            bitmaps[facet_id] = self.bitmap_for_ids(video_ids)
+        return bitmaps
+
+    @staticmethod
+    def facet_values(bitmaps, labels, ids):
+        return [
+            FacetValue(
+                facet_id, labels[facet_id], bitmaps[facet_id].bit_count()
+            )
+            for facet_id in ids
+            if bitmaps.get(facet_id)
+        ]
+
+    def tag_values(self, category_name):
+        """The tags of `category_name` that recorded videos carry."""
+        return self.facet_values(
+            self.tag_bitmaps,
+            self.tag_labels,
+            [
+                tag_id
+                for tag_id, category in self.tag_categories.items()
+                if category == category_name
+            ],
+        )
+
+    def presenter_values(self):
+        """The presenters of recorded videos."""
+        return self.facet_values(
+            self.presenter_bitmaps,
+            self.presenter_labels,
+            self.presenter_labels,
+        )
+
+    @staticmethod
+    def ids_for_slugs(slug_ids, slugs):
+        return [slug_ids[slug] for slug in slugs if slug in slug_ids]
+
+    def tag_ids_for_slugs(self, slugs):
+        """Ids of the tags with the given URL slugs, ignoring unknown ones."""
+        return self.ids_for_slugs(self.tag_slugs, slugs)
+
+    def presenter_ids_for_slugs(self, slugs):
+        """Ids of the presenters with these URL slugs, unknown ones ignored."""
+        return self.ids_for_slugs(self.presenter_slugs, slugs)
+
+    def bitmap_for_ids(self, video_ids):
+        """Bitmap of the recorded videos among `video_ids`."""
+        # Set bits in a byte buffer rather than OR-ing ever larger ints
+        buffer = bytearray((len(self.ordered_ids) + 7) // 8)
+        for video_id in video_ids:
+            pos = self.positions.get(video_id)
+            if pos is not None:
+                buffer[pos >> 3] |= 1 << (pos & 7)
+        return int.from_bytes(buffer, "little")
+
+    def contains(self, bitmap, video_id):
+        pos = self.positions.get(video_id)
+        return pos is not None and (bitmap >> pos) & 1 == 1
+
+    def tags_bitmap(self, category_name, tag_ids):
+        """Videos carrying any of `tag_ids` that belong to `category_name`."""
+        bitmap = 0
+        for tag_id in tag_ids:
+            if self.tag_categories.get(tag_id) == category_name:
+                bitmap |= self.tag_bitmaps.get(tag_id, 0)
+        return bitmap
+
+    def presenters_bitmap(self, presenter_ids):
+        """Videos presented by any of `presenter_ids`."""
+        bitmap = 0
+        for presenter_id in presenter_ids:
+            bitmap |= self.presenter_bitmaps.get(presenter_id, 0)
+        return bitmap
+
+    def random_ids(self, count, exclude_id=None):
+        """
+        Up to `count` distinct recorded video ids picked uniformly, other than
+        `exclude_id`.
+        """
+        positions = random.sample(
+            range(len(self.ordered_ids)), min(count + 1, len(self.ordered_ids))
+        )
+        ids = [self.ordered_ids[pos] for pos in positions]
+        return [video_id for video_id in ids if video_id != exclude_id][:count]
+
+    def page_ids(self, bitmap, offset, limit, start=0):
+        """
+        Ids of the videos in `bitmap`, in listing order, for one page
+        starting `offset` videos after position `start`.
+        """
+        ids = []
+        for index, pos in enumerate(iter_positions(bitmap >> start)):
+            if index >= offset + limit:
+                break
+            if index >= offset:
+                ids.append(self.ordered_ids[start + pos])
+        return ids
+
+    def seek(self, unixstart, video_id):
+        """Position of the first video listed after (unixstart, video_id)."""
+        return bisect_right(self.sort_keys, (-unixstart, -video_id))
+
+    def count_before(self, bitmap, position):
+        """Number of videos in `bitmap` listed before `position`."""
+        return (bitmap & ((1 << position) - 1)).bit_count()
+
+
+class FacetIndex:
+    """
+    Per-worker facet index for /videos filtering.
+
+    The snapshot is built lazily, dropped by `invalidate()` when the admin
+    changes data, and rebuilt after `max_age` seconds at the latest to pick up
+    writes made by other replicas or scripts.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._snapshot = None
+        self._built_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = None
+
+    def _is_fresh(self):
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._built_at < self.max_age
+        )
+
+    def snapshot(self):
+        if self._is_fresh():
+            return self._snapshot
+
+        with self._lock:
+            if not self._is_fresh():
+                generation = self._generation
+                snapshot = self.build()
+                self._snapshot = snapshot
+                # An invalidation that raced the build leaves it stale
+                self._built_at = (
+                    time.monotonic() if generation == self._generation else 0
+                )
+                return snapshot
+            return self._snapshot
+
+    @staticmethod
+    def build():
+        recorded = db_session.execute(
+            select(Video.id, Video.unixstart, Video.title)
+            .where(Video.recording.isnot(None))
+            .order_by(Video.unixstart.desc(), Video.id.desc())
+        ).all()
+        ordered_ids = [video_id for video_id, _, _ in recorded]
+        ordered_starts = [unixstart for _, unixstart, _ in recorded]
+
+        # (video id, text) pairs for typo-tolerant search
+        documents = [(video_id, title) for video_id, _, title in recorded]
+
+        tag_videos = {}
+        tag_categories = {}
+        tag_rows = db_session.execute(
+            select(Tag.id, Tag.name, TagCategory.name, VideoTag.video_id)
+            .join(TagCategory, Tag.tag_type_id == TagCategory.id)
+            .outerjoin(VideoTag, VideoTag.tag_id == Tag.id)
+        )
+        tag_slugs = {}
+        tag_labels = {}
+        for tag_id, tag_name, category_name, video_id in tag_rows:
+            if tag_id not in tag_categories:
+                tag_slugs[slugify(tag_name)] = tag_id
+                tag_labels[tag_id] = tag_name
+            tag_categories[tag_id] = category_name
+            videos = tag_videos.setdefault(tag_id, [])
+            if video_id is not None:
+                videos.append(video_id)
+                documents.append((video_id, tag_name))
+
+        presenters = db_session.execute(
+            select(Presenter.id, Presenter.name)
+        ).all()
+        presenter_names = dict(presenters)
+        presenter_slugs = {
+            slugify(name): presenter_id for presenter_id, name in presenters
+        }
+
+        presenter_videos = {}
+        presenter_rows = db_session.execute(
+            select(VideoPresenter.presenter_id, VideoPresenter.video_id)
+        )
+        for presenter_id, video_id in presenter_rows:
+            presenter_videos.setdefault(presenter_id, []).append(video_id)
+            documents.append((video_id, presenter_names.get(presenter_id, "")))
+
+        return FacetSnapshot(
+            ordered_ids,
+            ordered_starts,
+            tag_videos,
+            tag_categories,
+            presenter_videos,
+            presenter_names=PresenterNameIndex(presenters),
+            fuzzy=FuzzyIndex(documents),
+            tag_slugs=tag_slugs,
+            presenter_slugs=presenter_slugs,
+            tag_labels=tag_labels,
+            presenter_labels=presenter_names,
+        )
+
+
+facet_index = FacetIndex()
+invalidation_bus.subscribe(
+    lambda event: facet_index.invalidate(), CATALOGUE_TOPICS
+)
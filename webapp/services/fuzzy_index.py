@@ -0,0 +1,40 @@
+from webapp.utils.text_utils import TrigramIndex, tokenize
+
+# Minimum trigram similarity for a word to count as a typo of another,
+# "melisa" vs "melissa" scores 0.67, "python" vs "pylon" 0.3
+SIMILARITY_THRESHOLD = 0.4
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant matching of search words against the words of video
+    titles, presenter names and tag names.
+
+    Each distinct word maps to the videos it appears in, and a trigram index
+    over those words finds the ones similar to a (possibly misspelt) query
+    word.
+    """
+
+    def __init__(self, documents):
+        self.word_videos = {}
+        for video_id, text in documents:
+            for word in tokenize(text):
+                self.word_videos.setdefault(word, set()).add(video_id)
+
+        self.trigram_index = TrigramIndex(self.word_videos)
+
+    def match(self, query, threshold=SIMILARITY_THRESHOLD):
+        """Ids of the videos matching every word of `query`, allowing typos."""
+        matches = None
+        for word in tokenize(query):
+            word_matches = set()
+            for similar_word, _ in self.trigram_index.search(word, threshold):
+                word_matches |= self.word_videos[similar_word]
+
+            matches = (
+                word_matches if matches is None else matches & word_matches
+            )
+            if not matches:
+                return set()
+
+        return matches or set()
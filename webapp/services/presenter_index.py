@@ -0,0 +1,70 @@
+from bisect import bisect_left
+from webapp.utils.text_utils import normalize
+
+
+def substring_trigrams(text):
+    """Unpadded trigrams, any substring of 3 or more characters holds one."""
+    return {text[i:end] for i, end in enumerate(range(3, len(text) + 1))}
+
+
+class PresenterNameIndex:
+    """
+    Normalised presenter name tokens for the typo-tolerant search fallback.
+
+    A presenter matches a query when the query is a substring of their name,
+    or when one of their name parts is a prefix of the query or starts with
+    it. Substrings are found through a trigram index, prefixes through a
+    sorted list of name parts, so matching never scans every presenter.
+    """
+
+    def __init__(self, presenters):
+        self.names = {}
+        self.part_presenters = {}
+        self.name_trigrams = {}
+
+        for presenter_id, name in presenters:
+            normalized = normalize(name)
+            self.names[presenter_id] = normalized
+            for part in normalized.split():
+                self.part_presenters.setdefault(part, set()).add(presenter_id)
+            for trigram in substring_trigrams(normalized):
+                self.name_trigrams.setdefault(trigram, set()).add(presenter_id)
+
+        self.sorted_parts = sorted(self.part_presenters)
+
+    def match(self, query):
+        """Ids of the presenters whose name matches `query`."""
+        query = normalize(query)
+        if not query:
+            return set()
+
+        matches = set()
+
+        # Name parts starting with the query
+        index = bisect_left(self.sorted_parts, query)
+        while index < len(self.sorted_parts) and self.sorted_parts[
+            index
+        ].startswith(query):
+            matches |= self.part_presenters[self.sorted_parts[index]]
+            index += 1
+
+        # Name parts the query starts with
+        for end in range(1, len(query) + 1):
+            matches |= self.part_presenters.get(query[:end], set())
+
+        # Names containing the query
+        if len(query) >= 3:
+            postings = [
+                self.name_trigrams.get(trigram, set())
+                for trigram in substring_trigrams(query)
+            ]
+            candidates = set.intersection(*sorted(postings, key=len))
+        else:
+            candidates = self.names.keys()
+        matches.update(
+            presenter_id
+            for presenter_id in candidates
+            if query in self.names[presenter_id]
+        )
+
+        return matches
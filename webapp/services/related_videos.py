@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import time
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from models.video import Video
+from models.tag import Tag, TagCategory
+from models.associations import VideoPresenter, VideoRelated, VideoTag
+
+logger = logging.getLogger(__name__)
+
+# How much sharing a tag of each category counts towards relatedness
+CATEGORY_WEIGHTS = {"Topic": 3.0, "Event": 1.0, "Date": 0.5, "Location": 0.5}
+DEFAULT_CATEGORY_WEIGHT = 1.0
+PRESENTER_WEIGHT = 2.0
+# Added to related videos, halving for every year since they were recorded
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE = 365 * 86400
+
+TOP_N = 6
+
+# Scores computed at once, bounds the memory used to ~64MB
+BATCH_CELLS = 2**24
+# Largest dense video x feature matrix, ~256MB
+DENSE_CELLS = 2**26
+
+
+def load_catalogue(session):
+    """
+    Recorded videos with their start times, weighted tags and presenters,
+    as plain dicts: {video id: unixstart}, {video id: {tag id: weight}},
+    {video id: {presenter ids}}.
+    """
+    starts = dict(
+        session.execute(
+            select(Video.id, Video.unixstart).where(
+                Video.recording.isnot(None)
+            )
+        ).all()
+    )
+
+    video_tags = {}
+    tag_rows = session.execute(
+        select(VideoTag.video_id, VideoTag.tag_id, TagCategory.name)
+        .join(Tag, Tag.id == VideoTag.tag_id)
+        .join(TagCategory, TagCategory.id == Tag.tag_type_id)
+    )
+    for video_id, tag_id, category_name in tag_rows:
+        if video_id in starts:
+            weight = CATEGORY_WEIGHTS.get(
+                category_name, DEFAULT_CATEGORY_WEIGHT
+            )
+            video_tags.setdefault(video_id, {})[tag_id] = weight
+
+    video_presenters = {}
+    presenter_rows = session.execute(
+        select(VideoPresenter.video_id, VideoPresenter.presenter_id)
+    )
+    for video_id, presenter_id in presenter_rows:
+        if video_id in starts:
+            video_presenters.setdefault(video_id, set()).add(presenter_id)
+
+    return starts, video_tags, video_presenters
+
+
+def incidence_matrix(video_index, video_features, weights=None):
+    """
+    Sparse video x feature matrix with the weight of each feature of each
+    video (1 by default), and the number of features.
+    """
+    feature_index = {}
+    rows, columns, data = [], [], []
+    for video_id, features in video_features.items():
+        for feature in features:
+            rows.append(video_index[video_id])
+            columns.append(
+                feature_index.setdefault(feature, len(feature_index))
+            )
+            data.append(weights[video_id][feature] if weights else 1.0)
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (rows, columns)),
+        shape=(len(video_index), len(feature_index)),
+    )
+    return matrix
+
+
+def compute_related(
+    starts, video_tags, video_presenters, now_unix, top_n=TOP_N
+):
+    """
+    The `top_n` most related recorded videos of every recorded video, best
+    first, scored by the weighted tags and the presenters they share plus a
+    bonus for recent videos. Videos sharing nothing are never related.
+
+    Scores are the product of the weighted video x (tag + presenter)
+    incidence matrix with its binary transpose, computed a batch of rows at
+    a time so memory stays bounded whatever the size of the catalogue.
+    """
+    # Oldest first, so that on equal scores the higher index wins like the
+    # more recent video should
+    video_ids = sorted(
+        starts, key=lambda video_id: (starts[video_id], video_id)
+    )
+    video_index = {video_id: index for index, video_id in enumerate(video_ids)}
+    count = len(video_ids)
+    top_n = min(top_n, count - 1)
+    if top_n <= 0:
+        return {video_id: [] for video_id in video_ids}
+
+    weighted = sparse.hstack(
+        [
+            incidence_matrix(video_index, video_tags, video_tags),
+            incidence_matrix(video_index, video_presenters) * PRESENTER_WEIGHT,
+        ],
+        format="csr",
+    )
+    binary_transposed = (weighted != 0).astype(np.float32).T
+    # A dense right hand side makes the products an order of magnitude
+    # faster, as long as it fits
+    if binary_transposed.shape[0] * count <= DENSE_CELLS:
+        binary_transposed = binary_transposed.toarray()
+    else:
+        binary_transposed = binary_transposed.tocsc()
+
+    ages = now_unix - np.array(
+        [starts[video_id] for video_id in video_ids], dtype=np.float64
+    )
+    recency = (
+        RECENCY_WEIGHT * 0.5 ** (np.maximum(ages, 0) / RECENCY_HALF_LIFE)
+    ).astype(np.float32)
+
+    ids = np.array(video_ids)
+    related = {}
+    batch_size = max(1, BATCH_CELLS // count)
+    for batch_start in range(0, count, batch_size):
+        batch = np.arange(batch_start, min(batch_start + batch_size, count))
+        scores = weighted[batch] @ binary_transposed
+        if sparse.issparse(scores):
+            scores = scores.toarray()
+
+        np.copyto(scores, -np.inf, where=scores <= 0)
+        scores += recency
+        scores[np.arange(len(batch)), batch] = -np.inf
+
+        # Unordered top n of every row, then sorted by score and recency
+        top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.lexsort((-top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for row, index in enumerate(batch):
+            found = np.isfinite(top_scores[row])
+            related[video_ids[index]] = ids[top[row][found]].tolist()
+
+    return related
+
+
+def catalogue_digest(starts, video_tags, video_presenters):
+    """Digest of a catalogue `load_catalogue` returned, whatever its order."""
+    canonical = (
+        sorted(starts.items()),
+        sorted(
+            (video_id, sorted(tags.items()))
+            for video_id, tags in video_tags.items()
+        ),
+        sorted(
+            (video_id, sorted(ids))
+            for video_id, ids in video_presenters.items()
+        ),
+    )
+    return hashlib.sha256(repr(canonical).encode()).digest()
+
+
+def store_related(session, related):
+    """Replace the stored related videos with `related` and commit."""
+    session.execute(delete(VideoRelated))
+    rows = [
+        {"video_id": video_id, "rank": rank, "related_video_id": related_id}
+        for video_id, related_ids in related.items()
+        for rank, related_id in enumerate(related_ids)
+    ]
+    if rows:
+        session.execute(insert(VideoRelated), rows)
+    session.commit()
+
+
+class RelatedVideosJob:
+    """
+    Computes the related videos for the player page suggestions and stores
+    them in the `video_related` table, which the web workers read.
+
+    The computation is CPU bound, it runs in its own process, from
+    scripts/refresh-related-videos.py, on a single unit. `run` only
+    recomputes once the catalogue changed or after `max_age` seconds, for
+    the recency bonus. Videos recorded since the last run have no entry,
+    the player page falls back to querying.
+    """
+
+    def __init__(self, session_factory, max_age=3600):
+        self.session_factory = session_factory
+        self.max_age = max_age
+        self._digest = None
+        self._computed_at = None
+
+    def run(self, force=False):
+        """Recompute and store the related videos if needed, True if it did."""
+        session = self.session_factory()
+        try:
+            catalogue = load_catalogue(session)
+            digest = catalogue_digest(*catalogue)
+            if (
+                not force
+                and digest == self._digest
+                and time.monotonic() - self._computed_at < self.max_age
+            ):
+                return False
+
+            started = time.monotonic()
+            related = compute_related(*catalogue, now_unix=int(time.time()))
+            store_related(session, related)
+        finally:
+            session.close()
+
+        self._digest = digest
+        self._computed_at = time.monotonic()
+        logger.info(
+            f"Computed related videos for {len(related)} videos "
+            f"in {self._computed_at - started:.2f}s"
+        )
+        return True
@@ -0,0 +1,111 @@
+import threading
+import time
+from bisect import bisect_right
+from models.video import Video
+from webapp.database import db_session
+from webapp.invalidation import invalidation_bus, CATALOGUE_TOPICS
+from webapp.repositories.video_repository import VideoRepository
+
+
+class ScheduleSnapshot:
+    """
+    Live and upcoming sessions, valid until the next session starts or ends
+    (`valid_until`).
+
+    Videos are loaded in their own session and detached, with the
+    relationships the listings render already loaded, so the snapshot can be
+    shared between requests.
+    """
+
+    def __init__(self, live, upcoming):
+        self.live = live
+        self.upcoming = upcoming
+        self.upcoming_starts = [video.unixstart for video in upcoming]
+
+        boundaries = [video.unixend + 1 for video in live]
+        if upcoming:
+            boundaries.append(upcoming[0].unixstart)
+        self.valid_until = min(boundaries, default=None)
+
+    def is_valid_at(self, now_unix):
+        return self.valid_until is None or now_unix < self.valid_until
+
+    def split_upcoming(self, until):
+        """Upcoming videos starting up to `until`, and those after it."""
+        index = bisect_right(self.upcoming_starts, until)
+        return self.upcoming[:index], self.upcoming[index:]
+
+
+class ScheduleCache:
+    """
+    Per-worker cache of the live and upcoming sessions.
+
+    They only change when a session starts or ends, so the snapshot is
+    served from memory until the next such boundary, until `invalidate()` is
+    called after an admin edit, or after `max_age` seconds at the latest to
+    pick up writes made by other replicas or scripts.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._snapshot = None
+        self._built_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = None
+
+    def _is_fresh(self, now_unix):
+        return (
+            self._snapshot is not None
+            and self._snapshot.is_valid_at(now_unix)
+            and time.monotonic() - self._built_at < self.max_age
+        )
+
+    def snapshot(self, now_unix):
+        if self._is_fresh(now_unix):
+            return self._snapshot
+
+        with self._lock:
+            if not self._is_fresh(now_unix):
+                generation = self._generation
+                snapshot = self.build(now_unix)
+                self._snapshot = snapshot
+                # An invalidation that raced the build leaves it stale
+                self._built_at = (
+                    time.monotonic() if generation == self._generation else 0
+                )
+                return snapshot
+            return self._snapshot
+
+    @staticmethod
+    def build(now_unix):
+        session = db_session.session_factory()
+        try:
+            options = VideoRepository.listing_options()
+            live = (
+                session.query(Video)
+                .options(*options)
+                .filter(Video.unixstart <= now_unix, Video.unixend >= now_unix)
+                .all()
+            )
+            upcoming = (
+                session.query(Video)
+                .options(*options)
+                .filter(Video.unixstart > now_unix)
+                .order_by(Video.unixstart)
+                .all()
+            )
+        finally:
+            # Detaches the videos, everything the listings need is loaded
+            session.close()
+
+        return ScheduleSnapshot(live, upcoming)
+
+
+schedule_cache = ScheduleCache()
+invalidation_bus.subscribe(
+    lambda event: schedule_cache.invalidate(), CATALOGUE_TOPICS
+)
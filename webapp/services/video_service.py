@@ -1,12 +1,9 @@
+from bisect import bisect_left
 from datetime import datetime, timezone
-from sqlalchemy import func, and_, or_
-from webapp.database import db_session
-from models.video import Video
-from models.presenter import Presenter
-from models.tag import Tag, TagCategory
-from webapp.utils.text_utils import slugify
 from unidecode import unidecode
 from webapp.repositories.video_repository import VideoRepository
+from webapp.services.facet_index import facet_index
+from webapp.services.schedule_cache import schedule_cache
 
 class VideoService:
     def __init__(self):
@@ -18,116 +15,208 @@ class VideoService:
 
     def get_live_videos(self):
         """Get currently live videos."""
-        return self.repository.get_live_videos()
+        now_unix = int(datetime.now(timezone.utc).timestamp())
+        return list(schedule_cache.snapshot(now_unix).live)
+
+    def get_upcoming_videos(self, now_unix):
+        """Get videos starting in the next 24 hours and those further out."""
+        return schedule_cache.snapshot(now_unix).split_upcoming(
+            now_unix + 86400
+        )
+
+    def get_suggested_videos(self, video, limit=3):
+        """Get recorded videos to suggest alongside `video`."""
+        related = self.repository.get_related_videos(video.id, limit)
+        if related:
+            return related
+
+        # Not precomputed yet
+        topic_tags = [
+            tag.id for tag in video.tags if tag.category.name == "Topic"
+        ]
+
+        if topic_tags:
+            suggested_videos = self.repository.get_suggested_videos(
+                video, topic_tags, limit
+            )
+        else:
+            suggested_videos = self.repository.get_recent_recorded_videos(
+                video.id, limit
+            )
+
+        if not suggested_videos:
+            random_ids = facet_index.snapshot().random_ids(
+                limit, exclude_id=video.id
+            )
+            suggested_videos = self.repository.get_videos_by_ids(random_ids)
+
+        return suggested_videos
+
+    def get_random_video(self):
+        """(id, title) of a recorded video picked at random, None if none."""
+        random_ids = facet_index.snapshot().random_ids(1)
+        if not random_ids:
+            return None
+
+        title = self.repository.get_video_title(random_ids[0])
+        # Deleted since the snapshot was built
+        if title is None:
+            return None
+        return random_ids[0], title
+
+    def get_videos_for_sessions(self, tag_name, time_ranges):
+        """
+        Videos tagged `tag_name` (any tag if None) starting within each of the
+        (start, end) `time_ranges`, fetched with a single query.
+        """
+        if not time_ranges:
+            return []
+
+        videos = self.repository.get_videos_by_tag_in_range(
+            tag_name,
+            min(start for start, _ in time_ranges),
+            max(end for _, end in time_ranges)
+        )
+        starts = [video.unixstart for video in videos]
+
+        return [
+            videos[bisect_left(starts, start):bisect_left(starts, end)]
+            for start, end in time_ranges
+        ]
+
+    def get_recorded_videos_page(self, after, limit):
+        """
+        Up to `limit` recorded videos newest first, after the (unixstart, id)
+        pair `after`, and the number of recorded videos. The number comes
+        from the facet snapshot so it can be a few minutes behind.
+        """
+        videos = self.repository.get_recorded_videos_after(after, limit)
+        return videos, len(facet_index.snapshot().ordered_ids)
+
+    def get_tag_ids_by_slugs(self, slugs):
+        """Ids of the tags the URL filter slugs refer to."""
+        return facet_index.snapshot().tag_ids_for_slugs(slugs)
+
+    def get_presenter_ids_by_slugs(self, slugs):
+        """Ids of the presenters the URL filter slugs refer to."""
+        return facet_index.snapshot().presenter_ids_for_slugs(slugs)
 
     def get_tags_by_category(self, category_name):
-        """Get tags by category name that have associated videos with recordings."""
-        query = (db_session.query(Tag)
-                .join(TagCategory)
-                .join(Tag.videos)
-                .filter(TagCategory.name == category_name)
-                .filter(Video.recording.isnot(None))
-                .group_by(Tag.id, TagCategory.id)
-                .having(func.count(Video.id) > 0))
-        
+        """
+        Tags of the category carried by recorded videos, with the number of
+        those videos, from the facet snapshot.
+        """
+        tags = facet_index.snapshot().tag_values(category_name)
         if category_name == 'Date':
-            tags = query.all()
             def date_sort_key(tag):
                 quarter = int(tag.name[1])
                 year = int(tag.name[-4:])
                 return (-year, -quarter)
             return sorted(tags, key=date_sort_key)
         else:
-            return query.order_by(Tag.name).all()
+            return sorted(tags, key=lambda tag: tag.name)
 
     def get_presenters_with_videos(self):
-        """Get presenters who have recorded videos."""
-        return (db_session.query(Presenter)
-                .join(Presenter.videos)
-                .filter(Video.recording.isnot(None))
-                .group_by(Presenter.id)
-                .having(func.count(Video.id) > 0)
-                .order_by(Presenter.name)
-                .all())
-
-    def search_videos(self, search_query, topic_filter, event_filter, date_filter, presenter_filter, page, items_per_page):
-        """Search videos with filters and pagination."""
-        query_base = db_session.query(Video).filter(Video.recording.isnot(None))
-        matched_ids = None
-
-        def apply_filter(filter_query):
-            nonlocal matched_ids
-            filter_ids = {vid.id for vid in filter_query}
-            if matched_ids is None:
-                matched_ids = filter_ids
-            else:
-                matched_ids &= filter_ids
-            return len(matched_ids) > 0
+        """
+        Presenters of recorded videos, with the number of those videos, from
+        the facet snapshot.
+        """
+        presenters = facet_index.snapshot().presenter_values()
+        return sorted(presenters, key=lambda presenter: presenter.name)
+
+    def search_videos(
+        self,
+        search_query,
+        topic_filter,
+        event_filter,
+        date_filter,
+        presenter_filter,
+        page,
+        items_per_page,
+        after=None,
+    ):
+        """
+        Search videos with filters and pagination, returns the videos of the
+        page, the total and the page number.
+
+        `after` is the (unixstart, id) of the last video of the previous page,
+        the page then starts right after it rather than at `page`. Search
+        results are ranked by relevance and always use `page`.
+        """
+        snapshot = facet_index.snapshot()
+        matched = snapshot.all_recorded
 
         tag_filters = [
             ('Topic', topic_filter),
             ('Event', event_filter),
             ('Date', date_filter)
         ]
-        
+
         for category, filter_values in tag_filters:
             if filter_values:
-                tag_query = self.repository.get_videos_by_tag_category(category, filter_values)
-                if not apply_filter(tag_query):
-                    return [], 0
+                matched &= snapshot.tags_bitmap(category, filter_values)
+                if not matched:
+                    return [], 0, page
 
         if presenter_filter:
-            presenter_query = self.repository.get_videos_by_presenters(presenter_filter)
-            if not apply_filter(presenter_query):
-                return [], 0
+            matched &= snapshot.presenters_bitmap(presenter_filter)
+            if not matched:
+                return [], 0, page
+
+        # Search results keep their relevance order, everything else is
+        # newest first
+        ranked_ids = None
 
         if search_query:
             normalized_search = unidecode(search_query.lower())
             search_terms = normalized_search.split()
-            
-            search_query_obj = self.repository.get_videos_by_search_terms(
-                search_query,
-                normalized_search,
+
+            search_ids = self.repository.get_video_ids_by_search_terms(
                 search_terms
             )
-            
-            if not apply_filter(search_query_obj):
-                all_videos = self.repository.get_all_recorded_videos()
-                filtered_ids = set()
-                
-                search_tokens = slugify(search_query)
-                
-                for video in all_videos:
-                    for presenter in video.presenters:
-                        presenter_name = presenter.name.lower()
-                        normalized_presenter = unidecode(presenter_name)
-                        
-                        if normalized_search in normalized_presenter:
-                            filtered_ids.add(video.id)
-                            break
-                        
-                        name_parts = normalized_presenter.split()
-                        
-                        for part in name_parts:
-                            if part.startswith(normalized_search) or normalized_search.startswith(part):
-                                filtered_ids.add(video.id)
-                                break
-                                
-                            if normalized_search in part:
-                                filtered_ids.add(video.id)
-                                break
-                
-                if filtered_ids:
-                    matched_ids = filtered_ids
-
-        if matched_ids is None:
-            final_query = query_base
+            search_matched = matched & snapshot.bitmap_for_ids(search_ids)
+
+            if search_matched:
+                ranked_ids = [
+                    video_id
+                    for video_id in search_ids
+                    if snapshot.contains(search_matched, video_id)
+                ]
+            else:
+                # Nothing matched, most likely a partial presenter name or a
+                # typo
+                presenter_ids = snapshot.presenter_names.match(
+                    normalized_search
+                )
+                matched = snapshot.presenters_bitmap(
+                    presenter_ids
+                ) or snapshot.bitmap_for_ids(
+                    snapshot.fuzzy.match(normalized_search)
+                )
+
+        offset = (page - 1) * items_per_page
+        if ranked_ids is not None:
+            total_videos = len(ranked_ids)
+            page_ids = ranked_ids[offset:offset + items_per_page]
+        elif after is not None:
+            # Seek straight to the cursor whatever the depth of the page
+            total_videos = matched.bit_count()
+            start = snapshot.seek(*after)
+            page = snapshot.count_before(matched, start) // items_per_page + 1
+            page_ids = snapshot.page_ids(
+                matched, 0, items_per_page, start=start
+            )
         else:
-            final_query = query_base.filter(Video.id.in_(matched_ids))
-        
-        final_query = final_query.order_by(Video.unixstart.desc())
-        total_videos = self.repository.get_videos_count(final_query)
-        
-        videos = self.repository.get_videos_with_pagination(final_query, page, items_per_page)
-        
-        return videos, total_videos 
\ No newline at end of file
+            total_videos = matched.bit_count()
+            page_ids = snapshot.page_ids(matched, offset, items_per_page)
+        videos_by_id = {
+            video.id: video
+            for video in self.repository.get_videos_by_ids(page_ids)
+        }
+        videos = [
+            videos_by_id[video_id]
+            for video_id in page_ids
+            if video_id in videos_by_id
+        ]
+
+        return videos, total_videos, page
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded to `maxsize` entries, evicting the least
+    recently used one, whose entries expire `ttl` seconds after being set
+    (never if None).
+
+    Hits and misses are counted so callers can report the hit rate.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires_at = self._entries.get(key, (_MISSING, None))
+            if (
+                value is not _MISSING
+                and expires_at is not None
+                and expires_at <= time.monotonic()
+            ):
+                del self._entries[key]
+                value = _MISSING
+
+            if value is _MISSING:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = (
+            time.monotonic() + self.ttl if self.ttl is not None else None
+        )
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
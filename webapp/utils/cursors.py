@@ -0,0 +1,28 @@
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not produced by `encode_cursor`."""
+
+
+def encode_cursor(*key):
+    """
+    Opaque cursor pointing just past the row with the sort `key`, e.g. the
+    (unixstart, id) of a video or the id of a presenter.
+    """
+    payload = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, length=2):
+    """The sort key, `length` integers, that a cursor points past."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = tuple(json.loads(payload))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}") from e
+
+    if len(key) != length or not all(isinstance(value, int) for value in key):
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}")
+    return key
@@ -0,0 +1,67 @@
+import json
+from flask import Response, stream_with_context
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibSerializer:
+    name = "json"
+
+    def dumps(self, value, indent=False):
+        """UTF-8 encoded JSON of `value`, compact unless `indent`."""
+        if indent:
+            text = json.dumps(value, indent=2, ensure_ascii=False)
+        else:
+            text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return text.encode()
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def dumps(self, value, indent=False):
+        """UTF-8 encoded JSON of `value`, compact unless `indent`."""
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+
+
+# orjson is several times faster, the standard library is the fallback
+serializer = OrjsonSerializer() if orjson is not None else StdlibSerializer()
+
+
+def dumps(value, indent=False):
+    return serializer.dumps(value, indent)
+
+
+def json_response(value, indent=False):
+    """Response with the JSON of `value`, for use instead of `jsonify`."""
+    return Response(dumps(value, indent), mimetype="application/json")
+
+
+def stream_json(items, prefix="", suffix="", indent=False):
+    """
+    Response writing `items` as a JSON array, between `prefix` and `suffix`,
+    one item at a time as they are produced.
+
+    The request's session is removed once the view returns, `items` must
+    only query the database when iterated, e.g. be made by a generator
+    function.
+    """
+
+    def generate():
+        yield (prefix + "[").encode()
+        index = -1
+        for index, item in enumerate(items):
+            data = dumps(item, indent)
+            if indent:
+                # Indented as they would be inside the array, JSON strings
+                # never hold a raw newline
+                data = b"\n  " + data.replace(b"\n", b"\n  ")
+            yield b"," + data if index else data
+        yield (("\n]" if indent and index >= 0 else "]") + suffix).encode()
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/json"
+    )
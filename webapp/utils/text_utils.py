@@ -1,36 +1,94 @@
+import hashlib
+import re
+from array import array
+from markdown import markdown
+from slugify import slugify as py_slugify
 from unidecode import unidecode
+from webapp.utils.cache import LRUCache
+
+# Every video and presenter name is slugified on each page that links to it,
+# the set of distinct names is small
+slug_cache = LRUCache(maxsize=4096)
+# Rendered descriptions, keyed by the hash of their markdown
+markdown_cache = LRUCache(maxsize=1024)
+
+
+def normalize(text):
+    """Lowercase `text` and remove diacritics."""
+    if not text:
+        return ''
+    return unidecode(text.lower())
+
 
 def slugify(text):
+    """URL slug of `text`, memoised in `slug_cache`."""
+    slug = slug_cache.get(text)
+    if slug is None:
+        slug = py_slugify(text)
+        slug_cache.set(text, slug)
+    return slug
+
+
+def render_markdown(text):
+    """HTML of the markdown `text`, memoised in `markdown_cache`."""
+    if not text:
+        return ''
+    key = hashlib.sha256(text.encode()).digest()
+    html = markdown_cache.get(key)
+    if html is None:
+        html = markdown(text, extensions=['extra'])
+        markdown_cache.set(key, html)
+    return html
+
+
+def tokenize(text):
+    """Split `text` into normalized words."""
+    return re.findall(r'[a-z0-9]+', normalize(text))
+
+
+def trigrams(word):
     """
-    Normalize text by removing diacritics and tokenize it into individual words, 
-    subwords, and combined forms to improve partial matching.
+    Trigrams of a single word, padded the way pg_trgm does so that the start
+    of a word weighs more and short words still produce a few trigrams.
     """
-    if not text:
-        return []
-    
-    # Normalize to remove diacritics
-    normalized = unidecode(text.lower()).strip()
-    
-    # Tokenize by splitting on spaces and other separators
-    words = normalized.replace('-', ' ').replace('_', ' ').split()
-    
-    # Start with the full normalized text and individual words
-    tokens = [normalized] + words
-    
-    # Add combined versions for multi-word names
-    if len(words) > 1:
-        tokens.append(''.join(words))
-    
-    # Generate substrings for each word (minimum 3 characters)
-    subwords = []
-    for word in words:
-        if len(word) >= 3:
-            # Add the word itself and all substrings of at least 3 chars
-            for i in range(len(word) - 2):
-                for j in range(i + 3, len(word) + 1):
-                    subwords.append(word[i:j])
-    
-    # Add all unique tokens
-    tokens.extend(subwords)
-    
-    return list(set(tokens))
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Compact trigram index over a vocabulary of words, scored with the same
+    similarity as pg_trgm: shared trigrams / trigrams in either word.
+
+    Postings are arrays of word positions rather than sets, and a lookup
+    only touches the words that share at least one trigram with the query.
+    """
+
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(words))
+        self.sizes = array('H')
+        self.postings = {}
+
+        for position, word in enumerate(self.words):
+            word_trigrams = trigrams(word)
+            self.sizes.append(len(word_trigrams))
+            for trigram in word_trigrams:
+                self.postings.setdefault(trigram, array('I')).append(position)
+
+    def search(self, word, threshold=0.3):
+        """(word, similarity) of the indexed words like `word`, best first."""
+        word_trigrams = trigrams(word)
+        shared = {}
+        for trigram in word_trigrams:
+            for position in self.postings.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        matches = []
+        for position, count in shared.items():
+            similarity = count / (
+                len(word_trigrams) + self.sizes[position] - count
+            )
+            if similarity >= threshold:
+                matches.append((self.words[position], similarity))
+
+        return sorted(matches, key=lambda match: match[1], reverse=True)